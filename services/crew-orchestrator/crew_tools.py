@@ -7,11 +7,15 @@ voice command and vision verification systems.
 
 import os
 import sys
+import time
 import logging
+import threading
 from pathlib import Path
-from typing import Type
+from typing import Any, Dict, Tuple, Type
+import requests
+from requests.adapters import HTTPAdapter
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 
 # Ensure shared modules are available (mounted as /shared in Docker)
 # In Docker: /shared is mounted from host ./shared directory
@@ -31,25 +35,62 @@ logger = logging.getLogger("crew-orchestrator.tools")
 WINDOWS_VOICE_CONTROL_URL = os.getenv("WINDOWS_VOICE_CONTROL_URL", "http://localhost:8085")
 VISION_GATEWAY_URL = os.getenv("VISION_GATEWAY_URL", "http://vision-gateway:8088")
 
+# One keep-alive pool for every tool call (planner/verifier loops hit the same hosts)
+SHARED_HTTP = requests.Session()
+SHARED_HTTP.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+
 _voice_executor = WindowsVoiceExecutor(base_url=WINDOWS_VOICE_CONTROL_URL)
-_vision_client = VisionGatewayClient(base_url=VISION_GATEWAY_URL)
+_vision_client = VisionGatewayClient(base_url=VISION_GATEWAY_URL, session=SHARED_HTTP)
+
+# Short-lived vision answers: agents often re-ask the same question within a turn.
+# Keys carry a screen generation that every voice command bumps, so answers never
+# outlive an action that may have changed the screen.
+VISION_CACHE_TTL = float(os.getenv("VISION_CACHE_TTL", "0.5"))
+VISION_CACHE_MAX = 256
+_vision_cache: Dict[Tuple[int, str], Tuple[float, Dict[str, Any]]] = {}
+_vision_cache_lock = threading.Lock()
+_screen_generation = 0
+
+
+def _bump_screen_generation() -> None:
+    """Invalidate cached vision answers after a voice command"""
+    global _screen_generation
+    with _vision_cache_lock:
+        _screen_generation += 1
+        _vision_cache.clear()
+
+
+def _cached_answer(question: str) -> Dict[str, Any]:
+    """Answer a screen question, reusing an answer from the last VISION_CACHE_TTL seconds"""
+    with _vision_cache_lock:
+        key = (_screen_generation, question.lower())
+        entry = _vision_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < VISION_CACHE_TTL:
+            return entry[1]
+
+    result = _vision_client.answer_question(question)
+
+    with _vision_cache_lock:
+        now = time.monotonic()
+        if len(_vision_cache) >= VISION_CACHE_MAX:
+            for stale in [k for k, (ts, _) in _vision_cache.items() if now - ts >= VISION_CACHE_TTL]:
+                del _vision_cache[stale]
+        if len(_vision_cache) < VISION_CACHE_MAX:
+            _vision_cache[key] = (now, result)
+    return result
 
 
 class VoiceCommandInput(BaseModel):
     """Input schema for VoiceCommandTool."""
+    # Stripping runs before min_length, so whitespace-only commands are rejected
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     command: str = Field(
         ..., 
         min_length=1, 
         max_length=200,
         description="The exact voice command to speak to Windows"
     )
-    
-    @validator('command')
-    def validate_command(cls, v):
-        """Validate that command is meaningful"""
-        if not v or not v.strip():
-            raise ValueError("Command cannot be empty or whitespace only")
-        return v.strip()
 
 
 class VoiceCommandTool(BaseTool):
@@ -78,9 +119,12 @@ class VoiceCommandTool(BaseTool):
                 return f"Error: {error_msg}"
 
             command = command.strip()
-            logger.info(f"[VOICE TOOL] Executing voice command: '{command}'")
+            logger.info("[VOICE TOOL] Executing voice command: '%s'", command)
 
-            success, message = _voice_executor.speak(command)
+            try:
+                success, message = _voice_executor.speak(command)
+            finally:
+                _bump_screen_generation()
             if success:
                 return message
 
@@ -96,19 +140,14 @@ class VoiceCommandTool(BaseTool):
 
 class VisionVerificationInput(BaseModel):
     """Input schema for VisionVerificationTool."""
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     question: str = Field(
         ..., 
         min_length=1,
         max_length=200,
         description="The yes/no question to ask about the current screen state"
     )
-    
-    @validator('question')
-    def validate_question(cls, v):
-        """Validate that question is meaningful"""
-        if not v or not v.strip():
-            raise ValueError("Question cannot be empty or whitespace only")
-        return v.strip()
 
 
 class VisionVerificationTool(BaseTool):
@@ -137,9 +176,9 @@ class VisionVerificationTool(BaseTool):
                 return f"Error: {error_msg}"
 
             question = question.strip()
-            logger.info(f"[VISION TOOL] Verifying screen state: '{question}'")
+            logger.info("[VISION TOOL] Verifying screen state: '%s'", question)
 
-            result = _vision_client.answer_question(question)
+            result = _cached_answer(question)
             answer = result.get("answer", "Unknown")
             reason = result.get("reason", "")
 
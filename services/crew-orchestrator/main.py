@@ -6,10 +6,19 @@ Supports Excel, browsers, and other Windows applications.
 """
 
 import os
+import re
+import json
+import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any
+import httpx
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from crewai import Agent, Task, Crew, Process
 from crewai import LLM
 from crew_tools import VoiceCommandTool, VisionVerificationTool
@@ -21,20 +30,71 @@ logging.basicConfig(
 )
 logger = logging.getLogger("crew-orchestrator")
 
-# FastAPI app
-app = FastAPI(title="Crew Orchestrator", version="1.0.0")
+# FastAPI app; plain dict returns are encoded with orjson
+app = FastAPI(title="Crew Orchestrator", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Threads for blocking CrewAI kickoffs and tool calls (voice bridge, vision gateway)
+CREW_THREADS = int(os.getenv("CREW_THREADS", "8"))
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Size the default executor used by asyncio.to_thread; set up direct planner calls if enabled"""
+    global planner_client, planner_batcher
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=CREW_THREADS))
+    if PLANNER_BATCH_WINDOW_MS > 0 or PLANNER_STREAM:
+        planner_client = httpx.AsyncClient(base_url=OLLAMA_URL, timeout=300.0)
+    if PLANNER_BATCH_WINDOW_MS > 0:
+        planner_batcher = PlannerBatcher(planner_client, PLANNER_BATCH_WINDOW_MS / 1000, PLANNER_BATCH_SIZE)
+        planner_batcher.start()
+        logger.info("Planner micro-batching enabled: %sms window, up to %d plans", PLANNER_BATCH_WINDOW_MS, PLANNER_BATCH_SIZE)
+    if PLANNER_STREAM:
+        logger.info("Planner streaming enabled: /crew/task/execute runs steps as they are planned")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the planner batcher and close the direct planner client"""
+    if planner_batcher is not None:
+        planner_batcher.close()
+    if planner_client is not None:
+        await planner_client.aclose()
 
 # Initialize Tools
 voice_tool = VoiceCommandTool()
 vision_tool = VisionVerificationTool()
 
 # Initialize LLM (Ollama via OpenAI-compatible API)
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'qwen3:4b-instruct-2507-q4_K_M')
+OPENAI_API_BASE = os.getenv('OPENAI_API_BASE', 'http://ollama-chat:11434/v1')
 llm = LLM(
-    model=f"openai/{os.getenv('OPENAI_MODEL', 'qwen3:4b-instruct-2507-q4_K_M')}",
-    base_url=os.getenv('OPENAI_API_BASE', 'http://ollama-chat:11434/v1'),
+    model=f"openai/{OPENAI_MODEL}",
+    base_url=OPENAI_API_BASE,
     api_key=os.getenv('OPENAI_API_KEY', 'sk-local')
 )
 
+# Opt-in planner micro-batching: plans requested within the window are sent to
+# Ollama's native /api/chat together, so a server with OLLAMA_NUM_PARALLEL > 1
+# decodes them side by side. 0 keeps planning on the CrewAI agent path.
+PLANNER_BATCH_WINDOW_MS = int(os.getenv("PLANNER_BATCH_WINDOW_MS", "0"))
+PLANNER_BATCH_SIZE = int(os.getenv("PLANNER_BATCH_SIZE", "8"))
+OLLAMA_URL = os.getenv("OLLAMA_URL", re.sub(r"/v1/?$", "", OPENAI_API_BASE))
+
+# Opt-in streamed planning for /crew/task/execute: steps start executing as soon as the
+# planner has written them instead of after the whole plan (native /api/chat, stream=true)
+PLANNER_STREAM = os.getenv("PLANNER_STREAM", "false").lower() == "true"
+
+# keep_alive sent with direct /api/chat planner calls so bursty traffic doesn't hit a cold
+# model load; -1 matches the ollama-chat OLLAMA_KEEP_ALIVE in docker-compose, "" omits it
+PLANNER_KEEP_ALIVE = os.getenv("PLANNER_KEEP_ALIVE", "-1")
+
+# Idle planning crews kept per prompt template; concurrent planner calls beyond this
+# build a crew of their own, which is dropped afterwards
+PLANNING_CREW_POOL_SIZE = int(os.getenv("PLANNING_CREW_POOL_SIZE", "4"))
+
+# Direct Ollama client for batched/streamed planner calls (created on startup when enabled)
+planner_client: Optional[httpx.AsyncClient] = None
+
 # --- Define the UI Automation Crew Agents ---
 
 # Agent 1: The Planner
@@ -72,20 +132,408 @@ verification_agent = Agent(
 
 class CrewTask(BaseModel):
     """Request model for crew tasks"""
+    # Stripping runs before min_length, so whitespace-only goals are rejected
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     goal: str = Field(..., min_length=1, max_length=500, description="The goal to accomplish")
     application: str = Field(default="Excel", description="Target application (e.g., 'Excel', 'Chrome', 'Notepad')")
 
-    @validator('goal')
-    def validate_goal(cls, v):
-        """Validate that goal is meaningful"""
-        if not v or not v.strip():
-            raise ValueError("Goal cannot be empty or whitespace only")
-        return v.strip()
-
-    @validator('application')
+    @field_validator('application')
+    @classmethod
     def validate_application(cls, v):
         """Normalize application name"""
-        return v.strip() if v else "Excel"
+        return v or "Excel"
+
+
+# Steps the plan marks as independent (depends_on) may run concurrently. The default of 1
+# keeps execution sequential, since every step drives the same Windows screen.
+MAX_PARALLEL_STEPS = int(os.getenv("MAX_PARALLEL_STEPS", "1"))
+
+# --- Planning prompt templates (filled with the request's application/goal) ---
+
+KICKOFF_PLAN_TEMPLATE = (
+    "Create a step-by-step plan to achieve this goal in {application}: '{goal}'. "
+    "For each step, define the exact voice command to speak (e.g., 'Open {application}', 'Click menu File', 'Type hello') "
+    "and a verification question to ask (e.g., 'Is {application} open?', 'Is the File menu visible?'). "
+    "Be specific about {application}'s UI elements and commands. "
+    "The final output must be just the plan itself, clearly listing each step's voice command and verification question."
+)
+KICKOFF_PLAN_OUTPUT = "A numbered list of steps. Each step includes a 'voice_command' and a 'verification_query'."
+
+EXECUTE_PLAN_TEMPLATE = (
+    "Create a step-by-step plan to achieve this goal in {application}: '{goal}'. "
+    "For each step, provide EXACTLY in this format:\n"
+    "Step N: voice_command='<exact command>' verification='<yes/no question>'\n"
+    "Example: Step 1: voice_command='Open Notepad' verification='Is Notepad window visible?'\n"
+    "A step that does not need the step right before it may end with depends_on=[...] listing the steps it needs "
+    "(e.g. depends_on=[1, 2], or depends_on=[] if none).\n"
+    "Be specific and detailed. Each step should be a single, atomic action."
+)
+EXECUTE_PLAN_OUTPUT = "A numbered list where each line follows the format: Step N: voice_command='...' verification='...'"
+
+# Rapid actions whose result isn't worth a vision check (typing, enter/tab presses)
+SKIP_VERIFY_RE = re.compile(r"type|press enter|press tab", re.IGNORECASE)
+
+# Final step statuses counted in the execution summary
+FINAL_OK = frozenset({"verified", "completed"})
+FINAL_FAILED = frozenset({"failed_verification", "error"})
+
+# One EXECUTE_PLAN_TEMPLATE step line: number, command, verification, optional depends_on list.
+# The list is captured with its brackets so "depends_on=[]" is distinguishable from no clause.
+STEP_RE = re.compile(
+    r"Step\s+(\d+):\s*voice_command=['\"]([^'\"]+)['\"]\s*verification=['\"]([^'\"]+)['\"]"
+    r"(?:\s*depends_on=(\[[\d,\s]*\]))?",
+    re.IGNORECASE
+)
+
+# Loose fallback: any line mentioning "command" that has a colon; captures text after the first colon
+FALLBACK_STEP_RE = re.compile(r"^(?=[^\n]*command)[^\n:]*:([^\n]*)", re.IGNORECASE | re.MULTILINE)
+
+
+def build_planning_crew(template: str, expected_output: str) -> Crew:
+    """Planner crew whose task description is filled from kickoff inputs"""
+    return Crew(
+        agents=[planner],
+        tasks=[Task(description=template, expected_output=expected_output, agent=planner)],
+        process=Process.sequential,
+        verbose=True
+    )
+
+
+PLANNING_OUTPUTS = {
+    KICKOFF_PLAN_TEMPLATE: KICKOFF_PLAN_OUTPUT,
+    EXECUTE_PLAN_TEMPLATE: EXECUTE_PLAN_OUTPUT,
+}
+
+# Idle crews per template, reused across requests; CrewAI re-interpolates the task template
+# on every kickoff. A crew keeps per-run state on its task, so it is taken out of the pool
+# for the length of one kickoff (list pop/append are atomic across planner threads).
+PLANNING_CREWS: Dict[str, List[Crew]] = {
+    template: [build_planning_crew(template, expected_output)]
+    for template, expected_output in PLANNING_OUTPUTS.items()
+}
+
+
+def run_planner(template: str, task: CrewTask) -> str:
+    """Run a pooled planning crew for a template on the task's application/goal"""
+    idle = PLANNING_CREWS[template]
+    try:
+        crew = idle.pop()
+    except IndexError:
+        # Every pooled crew is mid-kickoff: plan on a new one instead of waiting
+        crew = build_planning_crew(template, PLANNING_OUTPUTS[template])
+    try:
+        return str(crew.kickoff(inputs={"application": task.application, "goal": task.goal}))
+    finally:
+        if len(idle) < PLANNING_CREW_POOL_SIZE:
+            idle.append(crew)
+
+
+def planner_messages(template: str, expected_output: str, task: CrewTask) -> List[Dict[str, str]]:
+    """Chat messages equivalent to the planner agent working on a filled template"""
+    return [
+        {"role": "system", "content": f"You are {planner.role}. {planner.backstory}\nYour personal goal is: {planner.goal}"},
+        {"role": "user", "content": (
+            template.format(application=task.application, goal=task.goal)
+            + f"\n\nThis is the expected criteria for your final answer: {expected_output}"
+        )},
+    ]
+
+
+def planner_request(messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+    """Native /api/chat body for a planner call"""
+    body = {"model": OPENAI_MODEL, "messages": messages, "stream": stream}
+    if PLANNER_KEEP_ALIVE:
+        # Ollama reads bare numbers as seconds and strings as durations ("1h")
+        body["keep_alive"] = int(PLANNER_KEEP_ALIVE) if PLANNER_KEEP_ALIVE.lstrip("-").isdigit() else PLANNER_KEEP_ALIVE
+    return body
+
+
+class PlannerBatcher:
+    """Coalesces concurrent planner prompts into batches dispatched to Ollama together"""
+
+    def __init__(self, client: httpx.AsyncClient, window: float, max_batch: int):
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.dispatches: Set[asyncio.Task] = set()
+        self.worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.worker = asyncio.create_task(self._collect())
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    async def submit(self, messages: List[Dict[str, str]]) -> str:
+        """Queue a prompt and wait for its plan"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((messages, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            logger.debug("Dispatching planner batch of %d", len(batch))
+            dispatch = asyncio.create_task(self._dispatch(batch))
+            self.dispatches.add(dispatch)
+            dispatch.add_done_callback(self.dispatches.discard)
+
+    async def _dispatch(self, batch):
+        await asyncio.gather(*(self._complete(messages, future) for messages, future in batch))
+
+    async def _complete(self, messages, future):
+        try:
+            response = await self.client.post(
+                "/api/chat",
+                json=planner_request(messages, stream=False)
+            )
+            response.raise_for_status()
+            if not future.done():
+                future.set_result(response.json()["message"]["content"])
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+
+planner_batcher: Optional[PlannerBatcher] = None
+
+
+# Plans for repeated goals (retries, demos) are reused instead of re-planned.
+# Keyed by a SHA-1 of template/application/goal; 0 for either setting disables it.
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "512"))
+PLAN_CACHE_TTL = float(os.getenv("PLAN_CACHE_TTL", "3600"))
+plan_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+plan_cache_stats = {"hits": 0, "misses": 0}
+
+
+def plan_cache_key(template: str, task: CrewTask) -> bytes:
+    return hashlib.sha1("\x00".join((template, task.application, task.goal)).encode()).digest()
+
+
+def cached_plan(template: str, task: CrewTask) -> Optional[str]:
+    """Return a fresh cached plan for the task, if any"""
+    key = plan_cache_key(template, task)
+    entry = plan_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] >= PLAN_CACHE_TTL:
+        return None
+    plan_cache.move_to_end(key)
+    return entry[1]
+
+
+def store_plan(template: str, task: CrewTask, plan: str) -> None:
+    """Remember a plan, evicting the least recently used beyond PLAN_CACHE_SIZE"""
+    if PLAN_CACHE_SIZE <= 0 or PLAN_CACHE_TTL <= 0:
+        return
+    key = plan_cache_key(template, task)
+    plan_cache[key] = (time.monotonic(), plan)
+    plan_cache.move_to_end(key)
+    while len(plan_cache) > PLAN_CACHE_SIZE:
+        plan_cache.popitem(last=False)
+
+
+def forget_plan(template: str, task: CrewTask) -> None:
+    """Drop a cached plan, e.g. one that turned out not to parse into steps"""
+    plan_cache.pop(plan_cache_key(template, task), None)
+
+
+async def generate_plan(template: str, expected_output: str, task: CrewTask) -> str:
+    """Produce a plan for the task from the cache, the batcher if enabled, or the CrewAI planner"""
+    plan = cached_plan(template, task)
+    if plan is not None:
+        plan_cache_stats["hits"] += 1
+        logger.info("♻️  Reusing cached plan for %s: %s", task.application, task.goal)
+        return plan
+    plan_cache_stats["misses"] += 1
+
+    if planner_batcher is None:
+        plan = await asyncio.to_thread(run_planner, template, task)
+    else:
+        plan = await planner_batcher.submit(planner_messages(template, expected_output, task))
+
+    store_plan(template, task, plan)
+    return plan
+
+
+def parse_step(num: str, voice_cmd: str, verification: str, deps: str,
+               previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a step dict from one STEP_RE match"""
+    if deps:
+        depends_on = [int(n) for n in deps.strip("[]").split(",") if n.strip()]
+    else:
+        # No explicit dependencies: the step follows the one before it
+        depends_on = [previous["step"]] if previous else []
+    return {
+        "step": int(num),
+        "voice_command": voice_cmd.strip(),
+        "verification_query": verification.strip(),
+        "depends_on": depends_on,
+        "status": "pending"
+    }
+
+
+def parse_plan(plan_text: str) -> List[Dict[str, Any]]:
+    """Parse plan text into steps, falling back to loose 'command:' lines"""
+    steps = []
+
+    # Parse steps using regex to extract voice_command and verification
+    for match in STEP_RE.findall(plan_text):
+        steps.append(parse_step(*match, steps[-1] if steps else None))
+
+    if not steps:
+        logger.warning("Could not parse structured steps, attempting fallback parsing...")
+        # Fallback: try to extract any commands mentioned
+        for step_num, command in enumerate(FALLBACK_STEP_RE.findall(plan_text), 1):
+            steps.append({
+                "step": step_num,
+                "voice_command": command.strip(),
+                "verification_query": "Is the action complete?",
+                "depends_on": [step_num - 1] if step_num > 1 else [],
+                "status": "pending"
+            })
+
+    return steps
+
+
+async def stream_plan(task: CrewTask, step_queue: asyncio.Queue) -> str:
+    """Stream an execute plan from Ollama, queueing each step once its line is complete
+
+    Puts None on the queue when the stream ends (or fails) and returns the full plan text.
+    """
+    parts = []
+    line_buffer = ""
+    previous = None
+
+    def take(line: str):
+        nonlocal previous
+        match = STEP_RE.search(line)
+        if match:
+            previous = parse_step(*match.groups(), previous)
+            step_queue.put_nowait(previous)
+
+    try:
+        async with planner_client.stream(
+            "POST",
+            "/api/chat",
+            json=planner_request(planner_messages(EXECUTE_PLAN_TEMPLATE, EXECUTE_PLAN_OUTPUT, task), stream=True)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                text = json.loads(line).get("message", {}).get("content", "")
+                parts.append(text)
+                *complete, line_buffer = (line_buffer + text).split("\n")
+                for complete_line in complete:
+                    take(complete_line)
+        take(line_buffer)
+    finally:
+        step_queue.put_nowait(None)
+    return "".join(parts)
+
+
+async def run_plan_steps(steps: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                         on_step_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+    """Run steps once everything they depend on has finished
+
+    Independent steps may overlap, bounded by MAX_PARALLEL_STEPS.
+    """
+    step_limit = asyncio.Semaphore(MAX_PARALLEL_STEPS)
+
+    async def run_limited(step):
+        async with step_limit:
+            await run_step(step, len(steps), execution_log)
+        if on_step_done is not None:
+            on_step_done(step)
+
+    known = {s["step"] for s in steps}
+    done = set()
+    pending = steps
+    while pending:
+        ready = [s for s in pending if all(d in done or d not in known for d in s["depends_on"])]
+        if not ready:
+            # Cyclic dependencies: fall back to plan order
+            ready = pending[:1]
+        await asyncio.gather(*(run_limited(s) for s in ready))
+        done.update(s["step"] for s in ready)
+        pending = [s for s in pending if all(s is not r for r in ready)]
+
+
+async def run_step(step: Dict[str, Any], total_steps: Optional[int], execution_log: List[Dict[str, Any]]) -> None:
+    """Execute one plan step (voice command, settle delay, optional vision check)"""
+    step_num = step["step"]
+    voice_cmd = step["voice_command"]
+    verification_query = step["verification_query"]
+
+    logger.info("🎯 Step %s/%s: %s", step_num, total_steps or '?', voice_cmd)
+
+    # Execute voice command
+    try:
+        logger.info("🎤 Executing: '%s'", voice_cmd)
+        message = await asyncio.to_thread(voice_tool._run, voice_cmd)
+
+        step["status"] = "executed"
+        step["execution_result"] = message
+
+        execution_log.append({
+            "step": step_num,
+            "action": "voice_command",
+            "command": voice_cmd,
+            "success": "✅" in message,
+            "message": message
+        })
+
+        # Wait a bit for the action to take effect (without blocking the event loop)
+        await asyncio.sleep(2)
+
+        # Verify the step (only if verification makes sense)
+        # Skip verification for typing commands or other rapid actions
+        if SKIP_VERIFY_RE.search(voice_cmd) is None and verification_query:
+            logger.info("👁️  Verifying: '%s'", verification_query)
+            verification_result = await asyncio.to_thread(vision_tool._run, verification_query)
+
+            step["verification_result"] = verification_result
+            is_verified = "yes" in verification_result.lower() or "true" in verification_result.lower()
+
+            execution_log.append({
+                "step": step_num,
+                "action": "verification",
+                "query": verification_query,
+                "result": verification_result,
+                "verified": is_verified
+            })
+
+            if is_verified:
+                step["status"] = "verified"
+                logger.info("✅ Step %s verified successfully", step_num)
+            else:
+                step["status"] = "failed_verification"
+                logger.warning("⚠️  Step %s verification failed: %s", step_num, verification_result)
+        else:
+            logger.info("⏭️  Skipping verification for rapid action: '%s'", voice_cmd)
+            step["status"] = "completed"
+
+    except Exception as e:
+        logger.error("❌ Step %s failed: %s", step_num, e)
+        step["status"] = "error"
+        step["error"] = str(e)
+        execution_log.append({
+            "step": step_num,
+            "action": "error",
+            "error": str(e)
+        })
 
 
 @app.get("/")
@@ -100,6 +548,7 @@ async def root():
             "health": "/healthz",
             "plan_only": "/crew/task/kickoff",
             "full_execution": "/crew/task/execute",
+            "full_execution_stream": "/crew/task/execute/stream",
             "legacy_excel": "/crew/excel/kickoff"
         },
         "features": [
@@ -134,10 +583,11 @@ async def health_check():
             "tools": {
                 "voice_command": "initialized",
                 "vision_verification": "initialized"
-            }
+            },
+            "plan_cache": {"size": len(plan_cache), **plan_cache_stats}
         }
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         return {"ok": False, "service": "crew-orchestrator", "error": str(e)}
 
 
@@ -172,238 +622,167 @@ async def kickoff_task(task: CrewTask) -> Dict[str, Any]:
         HTTPException: If task execution fails
     """
     try:
-        logger.info(f"Received task for {task.application} with goal: {task.goal}")
+        logger.info("Received task for %s with goal: %s", task.application, task.goal)
 
         if not task.goal:
             raise HTTPException(status_code=400, detail="Goal cannot be empty")
 
-        # Task 1: Create the plan
-        planning_task = Task(
-            description=f"Create a step-by-step plan to achieve this goal in {task.application}: '{task.goal}'. "
-                        "For each step, define the exact voice command to speak (e.g., 'Open {task.application}', 'Click menu File', 'Type hello') "
-                        "and a verification question to ask (e.g., 'Is {task.application} open?', 'Is the File menu visible?'). "
-                        "Be specific about {task.application}'s UI elements and commands. "
-                        "The final output must be just the plan itself, clearly listing each step's voice command and verification question.",
-            expected_output="A numbered list of steps. Each step includes a 'voice_command' and a 'verification_query'.",
-            agent=planner
-        )
-
-        # Create the crew and execute
-        automation_crew = Crew(
-            agents=[planner],
-            tasks=[planning_task],
-            process=Process.sequential,
-            verbose=True
-        )
-
-        logger.info(f"Starting crew execution for {task.application}: {task.goal}")
-        result = automation_crew.kickoff()
-        logger.info(f"Crew execution completed successfully")
+        logger.info("Starting crew execution for %s: %s", task.application, task.goal)
+        result = await generate_plan(KICKOFF_PLAN_TEMPLATE, KICKOFF_PLAN_OUTPUT, task)
+        logger.info("Crew execution completed successfully")
 
         return {
             "status": "success",
             "application": task.application,
             "goal": task.goal,
-            "result": str(result),
+            "result": result,
             "note": "This is the PLAN. Execution with verification loop is next phase."
         }
 
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error processing task: {str(e)}", exc_info=True)
+        logger.error("Error processing task: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Task execution failed: {str(e)}")
 
 
-@app.post("/crew/task/execute")
-async def execute_task(task: CrewTask) -> Dict[str, Any]:
-    """
-    Execute a UI automation task with full plan generation, execution, and verification loop
-
-    Args:
-        task: Task definition with goal and target application
-
-    Returns:
-        Execution results with detailed step-by-step status
-
-    Raises:
-        HTTPException: If task execution fails
-    """
-    import re
-
-    try:
-        logger.info(f"🚀 Starting FULL EXECUTION for {task.application}: {task.goal}")
-
+async def run_task(task: CrewTask, on_step_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Plan, execute and verify a task; on_step_done is called with each finished step"""
+    logger.info("🚀 Starting FULL EXECUTION for %s: %s", task.application, task.goal)
+
+    execution_log = []
+    steps = []
+    completed = failed = 0
+
+    def step_done(step):
+        # Tally each finished step here so the summary needs no second pass over steps
+        nonlocal completed, failed
+        if step["status"] in FINAL_OK:
+            completed += 1
+        elif step["status"] in FINAL_FAILED:
+            failed += 1
+        if on_step_done is not None:
+            on_step_done(step)
+
+    streamed = PLANNER_STREAM and cached_plan(EXECUTE_PLAN_TEMPLATE, task) is None
+    if streamed:
+        # Steps 1-3 overlapped: each step runs as soon as the planner has written it
+        logger.info("📋 Phase 1: Streaming plan, executing steps as they arrive...")
+        plan_cache_stats["misses"] += 1
+        step_queue: asyncio.Queue = asyncio.Queue()
+        planning = asyncio.create_task(stream_plan(task, step_queue))
+        while (step := await step_queue.get()) is not None:
+            steps.append(step)
+            await run_step(step, None, execution_log)
+            step_done(step)
+        plan_text = await planning
+        logger.info("✅ Plan streamed:\n%s", plan_text)
+    else:
         # Step 1: Generate the plan
         logger.info("📋 Phase 1: Generating plan...")
-        planning_task = Task(
-            description=f"Create a step-by-step plan to achieve this goal in {task.application}: '{task.goal}'. "
-                        "For each step, provide EXACTLY in this format:\n"
-                        "Step N: voice_command='<exact command>' verification='<yes/no question>'\n"
-                        "Example: Step 1: voice_command='Open Notepad' verification='Is Notepad window visible?'\n"
-                        "Be specific and detailed. Each step should be a single, atomic action.",
-            expected_output="A numbered list where each line follows the format: Step N: voice_command='...' verification='...'",
-            agent=planner
-        )
-
-        planning_crew = Crew(
-            agents=[planner],
-            tasks=[planning_task],
-            process=Process.sequential,
-            verbose=True
-        )
-
-        plan_result = planning_crew.kickoff()
-        plan_text = str(plan_result)
-        logger.info(f"✅ Plan generated:\n{plan_text}")
+        plan_text = await generate_plan(EXECUTE_PLAN_TEMPLATE, EXECUTE_PLAN_OUTPUT, task)
+        logger.info("✅ Plan generated:\n%s", plan_text)
 
+    if not steps:
         # Step 2: Parse the plan into structured steps
         logger.info("🔍 Phase 2: Parsing plan...")
-        steps = []
-
-        # Parse steps using regex to extract voice_command and verification
-        step_pattern = r"Step\s+(\d+):\s*voice_command=['\"]([^'\"]+)['\"]\s*verification=['\"]([^'\"]+)['\"]"
-        matches = re.finditer(step_pattern, plan_text, re.IGNORECASE)
-
-        for match in matches:
-            step_num = int(match.group(1))
-            voice_cmd = match.group(2).strip()
-            verification = match.group(3).strip()
-            steps.append({
-                "step": step_num,
-                "voice_command": voice_cmd,
-                "verification_query": verification,
-                "status": "pending"
-            })
-
-        if not steps:
-            logger.warning("Could not parse structured steps, attempting fallback parsing...")
-            # Fallback: try to extract any commands mentioned
-            lines = plan_text.split('\n')
-            step_num = 1
-            for line in lines:
-                if 'voice_command' in line.lower() or 'command' in line.lower():
-                    # Try to extract something useful
-                    if ':' in line:
-                        parts = line.split(':', 1)
-                        if len(parts) > 1:
-                            steps.append({
-                                "step": step_num,
-                                "voice_command": parts[1].strip(),
-                                "verification_query": "Is the action complete?",
-                                "status": "pending"
-                            })
-                            step_num += 1
+        steps = parse_plan(plan_text)
 
         if not steps:
+            # Don't let a retry of the same goal get this unparseable plan back from the cache
+            forget_plan(EXECUTE_PLAN_TEMPLATE, task)
             return {
                 "status": "error",
                 "message": "Could not parse plan into executable steps",
                 "raw_plan": plan_text
             }
 
-        logger.info(f"📝 Parsed {len(steps)} steps from plan")
+        logger.info("📝 Parsed %d steps from plan", len(steps))
 
         # Step 3: Execute each step with verification
         logger.info("⚙️  Phase 3: Executing steps with verification...")
-        execution_log = []
-
-        for step in steps:
-            step_num = step["step"]
-            voice_cmd = step["voice_command"]
-            verification_query = step["verification_query"]
-
-            logger.info(f"🎯 Step {step_num}/{len(steps)}: {voice_cmd}")
-
-            # Execute voice command
-            try:
-                logger.info(f"🎤 Executing: '{voice_cmd}'")
-                success, message = voice_tool._run(voice_cmd)
-
-                step["status"] = "executed"
-                step["execution_result"] = message
-
-                execution_log.append({
-                    "step": step_num,
-                    "action": "voice_command",
-                    "command": voice_cmd,
-                    "success": "✅" in message,
-                    "message": message
-                })
-
-                # Wait a bit for the action to take effect
-                import time
-                time.sleep(2)
-
-                # Verify the step (only if verification makes sense)
-                # Skip verification for typing commands or other rapid actions
-                skip_verification_keywords = ['type', 'press enter', 'press tab']
-                should_verify = not any(kw in voice_cmd.lower() for kw in skip_verification_keywords)
-
-                if should_verify and verification_query:
-                    logger.info(f"👁️  Verifying: '{verification_query}'")
-                    verification_result = vision_tool._run(verification_query)
-
-                    step["verification_result"] = verification_result
-                    is_verified = "yes" in verification_result.lower() or "true" in verification_result.lower()
-
-                    execution_log.append({
-                        "step": step_num,
-                        "action": "verification",
-                        "query": verification_query,
-                        "result": verification_result,
-                        "verified": is_verified
-                    })
-
-                    if is_verified:
-                        step["status"] = "verified"
-                        logger.info(f"✅ Step {step_num} verified successfully")
-                    else:
-                        step["status"] = "failed_verification"
-                        logger.warning(f"⚠️  Step {step_num} verification failed: {verification_result}")
-                else:
-                    logger.info(f"⏭️  Skipping verification for rapid action: '{voice_cmd}'")
-                    step["status"] = "completed"
-
-            except Exception as e:
-                logger.error(f"❌ Step {step_num} failed: {str(e)}")
-                step["status"] = "error"
-                step["error"] = str(e)
-                execution_log.append({
-                    "step": step_num,
-                    "action": "error",
-                    "error": str(e)
-                })
-
-        # Step 4: Return results
-        completed = sum(1 for s in steps if s["status"] in ["verified", "completed"])
-        failed = sum(1 for s in steps if s["status"] in ["failed_verification", "error"])
-
-        logger.info(f"🏁 Execution complete: {completed}/{len(steps)} successful, {failed} failed")
+        await run_plan_steps(steps, execution_log, step_done)
 
-        return {
-            "status": "completed",
-            "application": task.application,
-            "goal": task.goal,
-            "summary": {
-                "total_steps": len(steps),
-                "completed": completed,
-                "failed": failed,
-                "success_rate": f"{(completed/len(steps)*100):.1f}%"
-            },
-            "steps": steps,
-            "execution_log": execution_log,
-            "raw_plan": plan_text
-        }
+    if streamed:
+        # Cached only now that it is known to yield steps
+        store_plan(EXECUTE_PLAN_TEMPLATE, task, plan_text)
+
+    # Step 4: Return results
+    logger.info("🏁 Execution complete: %d/%d successful, %d failed", completed, len(steps), failed)
+
+    return {
+        "status": "completed",
+        "application": task.application,
+        "goal": task.goal,
+        "summary": {
+            "total_steps": len(steps),
+            "completed": completed,
+            "failed": failed,
+            "success_rate": f"{(completed/len(steps)*100):.1f}%"
+        },
+        "steps": steps,
+        "execution_log": execution_log,
+        "raw_plan": plan_text
+    }
+
+
+@app.post("/crew/task/execute")
+async def execute_task(task: CrewTask) -> Dict[str, Any]:
+    """
+    Execute a UI automation task with full plan generation, execution, and verification loop
 
+    Args:
+        task: Task definition with goal and target application
+
+    Returns:
+        Execution results with detailed step-by-step status
+
+    Raises:
+        HTTPException: If task execution fails
+    """
+    try:
+        return await run_task(task)
     except Exception as e:
-        logger.error(f"Fatal error in execution: {str(e)}", exc_info=True)
+        logger.error("Fatal error in execution: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
 
 
+@app.post("/crew/task/execute/stream")
+async def execute_task_stream(task: CrewTask) -> StreamingResponse:
+    """
+    Same as /crew/task/execute, reported as Server-Sent Events
+
+    Emits a `step` event as each step finishes, then one `result` event with the
+    summary (without the already-sent steps), or an `error` event. Disconnecting
+    cancels the remaining steps.
+    """
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+        # Serialize at completion time so later mutation can't leak into sent events
+        runner = asyncio.create_task(run_task(task, lambda step: queue.put_nowait(json.dumps(step))))
+        runner.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (step := await queue.get()) is not None:
+                yield f"event: step\ndata: {step}\n\n"
+            result = runner.result()
+            result.pop("steps", None)
+            result.pop("execution_log", None)
+            yield f"event: result\ndata: {json.dumps(result)}\n\n"
+        except Exception as e:
+            logger.error("Fatal error in streamed execution: %s", e, exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'detail': f'Execution failed: {str(e)}'})}\n\n"
+        finally:
+            runner.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 if __name__ == "__main__":
     import os
     import uvicorn
     port = int(os.getenv("PORT", "8085"))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Multiple workers need the import string so each process can load the app
+    workers = int(os.getenv("WORKERS", "1"))
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=port, workers=workers,
+                loop="uvloop", http="httptools")
@@ -25,28 +25,122 @@ Features:
 
 import re
 import os
-import json
+import gzip
+import math
+import time
+import asyncio
+import hashlib
 import logging
+import queue
+import uuid
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import asynccontextmanager
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any
 from enum import Enum
 
 import httpx
+import aiohttp
+import orjson
 from fastapi import FastAPI, HTTPException, Request, Header
-from fastapi.responses import StreamingResponse, Response
-from pydantic import BaseModel, Field
-
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from fastapi.responses import ORJSONResponse, StreamingResponse, Response
+from pydantic import BaseModel, Field, ValidationError
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import re2  # google-re2: linear-time DFA matching for the routing patterns
+except ImportError:
+    re2 = None
+
+try:
+    import ahocorasick  # pyahocorasick: single-pass literal prefilter for routing
+except ImportError:
+    ahocorasick = None
+
+try:
+    import hyperscan  # Intel Hyperscan: SIMD multi-pattern scanning for routing
+except ImportError:
+    hyperscan = None
+
+# Logging configuration: LOG_LEVEL=WARNING drops the per-request routing lines
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Request id from the caller's X-Request-ID (or generated), stamped on every log line
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+# Handlers only enqueue; a listener thread (run by lifespan) writes the lines, so stream
+# I/O stays off the event loop. Records logged before startup wait in the queue.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_output = logging.StreamHandler()
+_log_output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'))
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # prepare() merges args (and tracebacks) into msg
+_queue_handler.addFilter(RequestIdFilter())
+logging.basicConfig(level=LOG_LEVEL, handlers=[_queue_handler])
+log_listener = QueueListener(_log_queue, _log_output)
 logger = logging.getLogger("glados-orchestrator")
 
 # Configuration
 LETTA_BRIDGE_URL = os.getenv("LETTA_BRIDGE_URL", "http://hassistant-letta-bridge:8081")
 LETTA_API_KEY = os.getenv("LETTA_API_KEY", "d6DkfuU7zPOpcoeAVabiNNPhTH6TcFrZ")
+# Opt-in: coalesce memory searches arriving within this window into one
+# POST /memory/search_batch (0 = one GET /memory/search per lookup)
+LETTA_BATCH_WINDOW_MS = int(os.getenv("LETTA_BATCH_WINDOW_MS", "0"))
+# letta-bridge rejects batches of more than 32 queries, so larger values are clamped
+LETTA_BATCH_MAX = min(int(os.getenv("LETTA_BATCH_MAX", "32")), 32)
+# Opt-in: cache memory searches per (query, limit) for this many seconds (0 = off);
+# identical searches in flight at the same time share one upstream call. Only
+# save_memory invalidates it, so memories written through letta-bridge by other
+# clients can be served stale for up to the TTL.
+LETTA_CACHE_TTL = float(os.getenv("LETTA_CACHE_TTL", "0"))
+LETTA_CACHE_SIZE = int(os.getenv("LETTA_CACHE_SIZE", "512"))
+# Opt-in: merge streamed ndjson chunks that arrive within this many ms of each other
+# into one write to the client (0 = relay each upstream chunk as it arrives)
+STREAM_COALESCE_MS = float(os.getenv("STREAM_COALESCE_MS", "0"))
+STREAM_COALESCE_MAX = 8192
+# Opt-in: COMPLEX answers from Qwen shorter than this many words are returned directly,
+# skipping the Hermes personality rewrite (0 = always rewrite)
+SKIP_HERMES_REWRITE_UNDER = int(os.getenv("SKIP_HERMES_REWRITE_UNDER", "0"))
+# Short answers that look like failures still go through Hermes
+HERMES_REWRITE_REQUIRED_RE = re.compile(r"error|unable|i cannot|i can't", re.IGNORECASE)
+# Opt-in: have Ollama load Hermes while Qwen is still answering a COMPLEX query. Only
+# worth it when both models fit in VRAM together; otherwise the load evicts Qwen.
+HERMES_WARMUP = os.getenv("HERMES_WARMUP", "false").lower() == "true"
+# Opt-in for streamed COMPLEX queries: Qwen streams too, and Hermes starts rewriting its
+# first sentence while Qwen keeps generating, then continues with the rest
+COMPLEX_PIPELINE = os.getenv("COMPLEX_PIPELINE", "false").lower() == "true"
+FIRST_SENTENCE_RE = re.compile(r"[.!?](?:\s|$)")
+# Opt-in semantic cache for SIMPLE-route replies: a temperature-0 request whose last user
+# message embeds within SEMANTIC_CACHE_THRESHOLD (cosine) of a cached one, after the same
+# earlier messages, reuses that reply. Needs numpy and an embedding model in ollama-chat.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_EMBED_MODEL = os.getenv("SEMANTIC_CACHE_EMBED_MODEL", "nomic-embed-text")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+# Opt-in exact-match tier in front of the semantic cache: a temperature-0 SIMPLE request
+# with byte-identical model, messages, tools and options reuses the stored reply
+REPLY_CACHE_ENABLED = os.getenv("REPLY_CACHE_ENABLED", "false").lower() == "true"
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "1024"))
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", "3600"))
+# Router: "heuristic" (trigger words, patterns, word count) or "logistic" (logistic
+# regression over cheap query features; COMPLEX when P(complex) > ROUTER_THRESHOLD).
+# ROUTER_WEIGHTS points at a JSON {"bias": b, "weights": {feature: coef}} refit from
+# the logged per-request probabilities; the built-in coefficients are used otherwise.
+ROUTER_MODE = os.getenv("ROUTER_MODE", "heuristic").lower()
+ROUTER_THRESHOLD = float(os.getenv("ROUTER_THRESHOLD", "0.5"))
+ROUTER_WEIGHTS = os.getenv("ROUTER_WEIGHTS", "")
 PORT = int(os.getenv("PORT", "8082"))
+# uvicorn worker processes; each has its own clients, caches and batcher
+WORKERS = int(os.getenv("WORKERS", "1"))
 
 # Ollama configuration for routing
 OLLAMA_CHAT_URL = os.getenv("OLLAMA_CHAT_URL", "http://ollama-chat:11434")
@@ -54,19 +148,243 @@ OLLAMA_VISION_URL = os.getenv("OLLAMA_VISION_URL", "http://ollama-vision:11434")
 HERMES_MODEL = os.getenv("HERMES_MODEL", "glados-hermes3")
 QWEN_MODEL = os.getenv("QWEN_MODEL", "qwen3:4b-instruct-2507-q4_K_M")
 VISION_MODEL = os.getenv("VISION_MODEL", "qwen2.5vl:7b")
+# HTTP/2 on the shared httpx clients. It is negotiated via ALPN, so only https:// upstreams
+# use it; plain-http hosts on the compose network stay on pooled HTTP/1.1 either way.
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "true").lower() == "true"
+# Per-host overrides, e.g. OLLAMA_HTTP2=false if one backend misbehaves over h2
+OLLAMA_HTTP2 = os.getenv("OLLAMA_HTTP2", str(UPSTREAM_HTTP2)).lower() == "true"
+LETTA_HTTP2 = os.getenv("LETTA_HTTP2", str(UPSTREAM_HTTP2)).lower() == "true"
+# Connection pool size of the short-call (Letta) httpx client; idle keep-alive sockets
+# are dropped after HTTPX_KEEPALIVE_EXPIRY seconds
+HTTPX_MAX_CONNECTIONS = int(os.getenv("HTTPX_MAX_CONNECTIONS", "200"))
+HTTPX_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTPX_MAX_KEEPALIVE_CONNECTIONS", "100"))
+HTTPX_KEEPALIVE_EXPIRY = float(os.getenv("HTTPX_KEEPALIVE_EXPIRY", "30"))
+# Ollama calls run for seconds, so they get their own smaller pool: excess chats queue for
+# up to OLLAMA_POOL_TIMEOUT seconds (backpressure) and never hold up the short calls
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "50"))
+OLLAMA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OLLAMA_MAX_KEEPALIVE_CONNECTIONS", "25"))
+OLLAMA_POOL_TIMEOUT = float(os.getenv("OLLAMA_POOL_TIMEOUT", "60"))
+# gzip JSON replies of at least GZIP_MINIMUM_SIZE bytes for clients that accept it.
+# Streamed replies (ndjson tokens, pull progress) are never compressed: gzip would
+# hold tokens back in its buffer and delay time-to-first-token.
+RESPONSE_GZIP = os.getenv("RESPONSE_GZIP", "true").lower() == "true"
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "512"))
+# Opt-in Prometheus /metrics (needs prometheus_client): per-route request counts, plus
+# a latency histogram for /api/chat only
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+# Mirrors of the ollama-chat scheduler settings, only logged at startup. Concurrent chats
+# are already sent in parallel; Ollama serialises them unless NUM_PARALLEL > 1, and
+# SIMPLE/COMPLEX routing needs Hermes and Qwen loaded side by side (MAX_LOADED_MODELS >= 2).
+OLLAMA_NUM_PARALLEL = os.getenv("OLLAMA_NUM_PARALLEL", "unset")
+OLLAMA_MAX_LOADED_MODELS = os.getenv("OLLAMA_MAX_LOADED_MODELS", "unset")
+
+# Outbound bodies are pre-encoded with orjson instead of the clients' json= encoders
+JSON_HEADERS = {"content-type": "application/json"}
+# Connection-level headers that must not be relayed from upstream responses
+HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding"})
+# Request headers not forwarded by the pass-through proxy; Starlette already lowercases names.
+# A chunked upload arrives without content-length and is re-chunked by aiohttp.
+PROXY_SKIP_REQUEST_HEADERS = HOP_BY_HOP_HEADERS | {"host"}
+# Response headers not relayed by the pass-through proxy. aiohttp decompresses the upstream
+# body, so its content-encoding and content-length describe bytes the client never gets.
+PROXY_SKIP_RESPONSE_HEADERS = HOP_BY_HOP_HEADERS | {"content-encoding", "content-length"}
+
+# Shared upstream clients (created in lifespan):
+# - ollama_client: request/response Ollama calls (Qwen analysis, non-streaming chat, embeddings)
+# - stream_session: aiohttp session for the streaming and pass-through hot path
+# - letta_client: Letta Bridge calls, with the base URL and API key baked in
+ollama_client: Optional[httpx.AsyncClient] = None
+stream_session: Optional[aiohttp.ClientSession] = None
+letta_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the pooled HTTP clients so upstream connections are reused, close them on exit"""
+    global ollama_client, stream_session, letta_client, memory_batcher
+    log_listener.start()
+    loop = asyncio.get_running_loop()
+    logger.info("Event loop: %s.%s", type(loop).__module__, type(loop).__name__)
+    logger.info("Ollama scheduler: OLLAMA_NUM_PARALLEL=%s, OLLAMA_MAX_LOADED_MODELS=%s",
+                OLLAMA_NUM_PARALLEL, OLLAMA_MAX_LOADED_MODELS)
+    ollama_client = httpx.AsyncClient(
+        base_url=OLLAMA_CHAT_URL,
+        timeout=httpx.Timeout(120.0, connect=5.0, pool=OLLAMA_POOL_TIMEOUT),
+        # retries=1 only re-attempts failed connects (e.g. a pooled socket the upstream closed)
+        transport=httpx.AsyncHTTPTransport(
+            http2=OLLAMA_HTTP2,
+            retries=1,
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTPX_KEEPALIVE_EXPIRY
+            )
+        )
+    )
+    letta_client = httpx.AsyncClient(
+        base_url=LETTA_BRIDGE_URL,
+        headers={"x-api-key": LETTA_API_KEY},
+        timeout=httpx.Timeout(10.0, connect=5.0, pool=10.0),
+        transport=httpx.AsyncHTTPTransport(
+            http2=LETTA_HTTP2,
+            retries=1,
+            limits=httpx.Limits(
+                max_connections=HTTPX_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTPX_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTPX_KEEPALIVE_EXPIRY
+            )
+        )
+    )
+    # Streamed chats and pass-through calls all go to Ollama, so the same per-host cap applies
+    stream_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=200, limit_per_host=OLLAMA_MAX_CONNECTIONS, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=120)
+    )
+    if LETTA_BATCH_WINDOW_MS > 0:
+        memory_batcher = MemorySearchBatcher(LETTA_BATCH_WINDOW_MS / 1000, LETTA_BATCH_MAX)
+        memory_batcher.start()
+    try:
+        yield
+    finally:
+        if memory_batcher is not None:
+            memory_batcher.close()
+        await ollama_client.aclose()
+        await letta_client.aclose()
+        await stream_session.close()
+        log_listener.stop()
 
 app = FastAPI(
     title="GLaDOS Orchestrator - Unified Voice Architecture",
     version="2.2.0",
-    description="Tool endpoints, intelligent routing, and personality-consistent responses for Ollama LLM"
+    description="Tool endpoints, intelligent routing, and personality-consistent responses for Ollama LLM",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+class BufferedGZipMiddleware:
+    """gzip single-body responses; multi-chunk (streamed) responses pass through untouched"""
+
+    def __init__(self, app, minimum_size: int = 512, compresslevel: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until the first body shows whether it is streamed
+                return
+            if start is not None:
+                body = message.get("body", b"")
+                headers = MutableHeaders(raw=start["headers"])
+                if (not message.get("more_body", False) and len(body) >= self.minimum_size
+                        and "content-encoding" not in headers):
+                    body = gzip.compress(body, self.compresslevel)
+                    headers["Content-Encoding"] = "gzip"
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": body}
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+class RequestIdMiddleware:
+    """Bind X-Request-ID (the caller's, or a fresh one) for logging and echo it on the response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+if RESPONSE_GZIP:
+    app.add_middleware(BufferedGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+app.add_middleware(RequestIdMiddleware)
+
+# Fixed route labels keep metric cardinality bounded; other /api/* paths share one label
+METRIC_ROUTES = (
+    "/", "/healthz", "/livez", "/metrics", "/cache/stats", "/api/chat", "/api/*",
+    "/tool/list", "/tool/get_time", "/tool/letta_query", "/tool/execute_ha_skill", "other",
 )
 
+class RequestMetricsMiddleware:
+    """Count requests per route with pre-bound counter children; time only /api/chat"""
+
+    def __init__(self, app, requests_total, chat_seconds):
+        self.app = app
+        # Children are resolved once here, so a request costs one dict lookup and inc()
+        self.counters = {route: requests_total.labels(route=route) for route in METRIC_ROUTES}
+        self.counters["/metrics/"] = self.counters["/metrics"]  # the mount redirects here
+        self.chat_seconds = chat_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        counter = self.counters.get(path)
+        if counter is None:
+            counter = self.counters["/api/*" if path.startswith("/api/") else "other"]
+        counter.inc()
+        if path != "/api/chat":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Streams are timed to their last chunk
+            self.chat_seconds.observe(time.perf_counter() - start)
+
+if METRICS_ENABLED:
+    # prometheus_client is only imported when metrics are on, like numpy for the semantic cache
+    try:
+        import prometheus_client  # optional /metrics endpoint
+    except ImportError:
+        logger.warning("METRICS_ENABLED is set but prometheus_client is not installed; /metrics disabled")
+    else:
+        app.add_middleware(
+            RequestMetricsMiddleware,
+            requests_total=prometheus_client.Counter(
+                "glados_http_requests_total", "HTTP requests by route", ["route"]),
+            chat_seconds=prometheus_client.Histogram(
+                "glados_chat_request_seconds", "Time to complete /api/chat requests",
+                buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)),
+        )
+        app.mount("/metrics", prometheus_client.make_asgi_app())
+
 # Pydantic models for tool requests/responses
 class ToolResponse(BaseModel):
     success: bool
     data: Any = None
     error: Optional[str] = None
 
+def tool_response(data: Any = None, error: Optional[str] = None) -> ORJSONResponse:
+    """ToolResponse-shaped reply encoded directly with orjson (no model round trip)"""
+    return ORJSONResponse({"success": error is None, "data": data, "error": error})
+
 class LettaQueryRequest(BaseModel):
     query: str
     limit: int = 5
@@ -75,6 +393,13 @@ class HASkillRequest(BaseModel):
     skill_name: str
     parameters: Dict[str, Any] = {}
 
+class ToolCall(BaseModel):
+    name: str
+    arguments: Dict[str, Any] = {}
+
+class ToolBatchRequest(BaseModel):
+    calls: List[ToolCall] = Field(..., max_length=32)
+
 class QueryComplexity(Enum):
     SIMPLE = "simple"
     COMPLEX = "complex"
@@ -139,129 +464,776 @@ TOOL_DEFINITIONS = [
     }
 ]
 
+# /tool/list never changes at runtime, so it is encoded once at import
+TOOL_LIST_JSON = orjson.dumps({
+    "tools": TOOL_DEFINITIONS,
+    "version": "2.2.0",
+    "description": "GLaDOS Orchestrator Tool Provider"
+})
+
+# Personality injected into SIMPLE chats in place of HA's own system message
+GLADOS_SYSTEM_MSG = {
+    "role": "system",
+    "content": "You are GLaDOS, the sarcastic AI from Portal. You are witty, intelligent, and occasionally passive-aggressive. You help with tasks while maintaining your characteristic dry humor."
+}
+
 # Complexity detection patterns (from POC)
 SIMPLE_PATTERNS = [
-    re.compile(r'\b(turn|set|dim|brighten|switch)\s+(on|off)\b', re.IGNORECASE),
-    re.compile(r'\b(what|tell|give|show)\b', re.IGNORECASE),
-    re.compile(r'\b(open|close|lock|unlock)\b', re.IGNORECASE),
-    re.compile(r'\b(play|pause|stop|skip|next|previous)\b', re.IGNORECASE),
-    re.compile(r'\b(hello|hi|hey|good morning|good evening)\b', re.IGNORECASE),
-    re.compile(r'\b(how are you|how\'s it going|what\'s up)\b', re.IGNORECASE),
-    re.compile(r'\b(thank|thanks|please)\b', re.IGNORECASE),
+    r'\b(turn|set|dim|brighten|switch)\s+(on|off)\b',
+    r'\b(what|tell|give|show)\b',
+    r'\b(open|close|lock|unlock)\b',
+    r'\b(play|pause|stop|skip|next|previous)\b',
+    r'\b(hello|hi|hey|good morning|good evening)\b',
+    r'\b(how are you|how\'s it going|what\'s up)\b',
+    r'\b(thank|thanks|please)\b',
 ]
 
 COMPLEX_PATTERNS = [
-    re.compile(r'\b(plan|schedule|organize|arrange)\s+(my|a|the)\b', re.IGNORECASE),
-    re.compile(r'\b(calendar|appointment|meeting)\s+(on|at|for|tomorrow|next)\b', re.IGNORECASE),
-    re.compile(r'\b(if.*then|when.*then)\b', re.IGNORECASE),
-    re.compile(r'\b(compare|analyze|explain|why|how does)\b', re.IGNORECASE),
+    r'\b(plan|schedule|organize|arrange)\s+(my|a|the)\b',
+    r'\b(calendar|appointment|meeting)\s+(on|at|for|tomorrow|next)\b',
+    r'\b(if.*then|when.*then)\b',
+    r'\b(compare|analyze|explain|why|how does)\b',
 ]
 
+# Literals that every match of the corresponding class must contain.
+# Used as a cheap prefilter: no literal present means the regex cannot match.
+SIMPLE_KEYWORDS = [
+    "turn", "set", "dim", "brighten", "switch",
+    "what", "tell", "give", "show",
+    "open", "close", "lock", "unlock",
+    "play", "pause", "stop", "skip", "next", "previous",
+    "hello", "hi", "hey", "good morning", "good evening",
+    "how are you", "how's it going",
+    "thank", "please",
+]
+
+COMPLEX_KEYWORDS = [
+    "plan", "schedule", "organize", "arrange",
+    "calendar", "appointment", "meeting",
+    "then",
+    "compare", "analyze", "explain", "why", "how does",
+]
+
+# Single words that on their own satisfy a pattern of the class.
+# Checked with set membership on the split query before any regex runs.
+SIMPLE_TRIGGERS = frozenset({
+    "what", "tell", "give", "show",
+    "open", "close", "lock", "unlock",
+    "play", "pause", "stop", "skip", "next", "previous",
+    "hello", "hi", "hey",
+    "thank", "thanks", "please",
+})
+
+COMPLEX_TRIGGERS = frozenset({"compare", "analyze", "explain", "why"})
+
+def _compile_alternation(patterns: List[str], prefix: str, engine=re):
+    """Fuse patterns into a single alternation with one named group per pattern
+
+    Patterns are lowercase and matched case-sensitively: callers lowercase
+    the query once up front. `engine` is the stdlib re module or RE2.
+    """
+    joined = "|".join(f"(?P<{prefix}{i}>{p})" for i, p in enumerate(patterns))
+    return engine.compile(joined)
+
+def _matched_pattern(match, patterns: List[str]) -> str:
+    """Map the named group that matched back to its source pattern"""
+    return patterns[int(match.lastgroup[1:])]
+
+def _compile_matcher(patterns: List[str], prefix: str):
+    """Compile a pattern class into search(text) -> matched source pattern or None
+
+    ASCII text goes to Hyperscan (all patterns in one SIMD pass) when it is
+    installed. Everything else goes to RE2, which never backtracks, so the
+    '.*' patterns stay linear on any input. RE2's \\b is ASCII-only: a
+    non-ASCII letter next to a keyword counts as a word boundary. The stdlib
+    engine is only used when google-re2 is missing.
+    """
+    regex = _compile_alternation(patterns, prefix, re2 if re2 is not None else re)
+
+    def regex_search(text: str) -> Optional[str]:
+        match = regex.search(text)
+        return _matched_pattern(match, patterns) if match else None
+
+    if hyperscan is not None:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[p.encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+        )
+
+        def on_match(pattern_id, start, end, flags, hits):
+            hits.append(pattern_id)
+            return True  # Stop at the first hit
+
+        def hyperscan_search(text: str) -> Optional[str]:
+            if not text.isascii():
+                return regex_search(text)
+            hits = []
+            try:
+                database.scan(text.encode(), match_event_handler=on_match, context=hits)
+            except hyperscan.ScanTerminated:
+                pass
+            return patterns[hits[0]] if hits else None
+
+        return hyperscan_search
+
+    return regex_search
+
+def _build_prefilter(keywords: List[str]):
+    """Build an Aho-Corasick automaton over keywords (None if unavailable)
+
+    Skipped under Hyperscan, which already prefilters on literals internally.
+    """
+    if ahocorasick is None or hyperscan is not None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+def _may_match(prefilter, text: str) -> bool:
+    """Return False only when no keyword occurs, i.e. the class regex cannot match"""
+    return prefilter is None or next(prefilter.iter(text), None) is not None
+
+# One search per class instead of one per pattern
+REGEX_ENGINE = "hyperscan" if hyperscan is not None else "re2" if re2 is not None else "re"
+SIMPLE_MATCHER = _compile_matcher(SIMPLE_PATTERNS, "s")
+COMPLEX_MATCHER = _compile_matcher(COMPLEX_PATTERNS, "c")
+SIMPLE_PREFILTER = _build_prefilter(SIMPLE_KEYWORDS)
+COMPLEX_PREFILTER = _build_prefilter(COMPLEX_KEYWORDS)
+
 def detect_complexity(query: str) -> QueryComplexity:
     """Determine if query is simple or complex"""
-    query_lower = query.lower()
-    word_count = len(query_lower.split())
+    if ROUTER_MODE == "logistic":
+        probability = complexity_probability(query.lower().strip())
+        complex_query = probability > ROUTER_THRESHOLD
+        logger.info("Route %s (p_complex=%.3f)", "COMPLEX" if complex_query else "SIMPLE", probability)
+        return QueryComplexity.COMPLEX if complex_query else QueryComplexity.SIMPLE
+    return _detect_complexity_cached(query.lower().strip())
+
+@lru_cache(maxsize=4096)
+def _detect_complexity_cached(query_lower: str) -> QueryComplexity:
+    """Classify a normalized (lowercased, stripped) query; logs only on cache miss"""
+    words = query_lower.split()
+    word_count = len(words)
 
-    logger.debug(f"Analyzing query: '{query}' ({word_count} words)")
+    logger.debug("Analyzing query: '%s' (%s words)", query_lower, word_count)
 
     # Check for complex patterns first
-    for pattern in COMPLEX_PATTERNS:
-        if pattern.search(query_lower):
-            logger.info(f"✓ COMPLEX pattern matched: {pattern.pattern}")
-            return QueryComplexity.COMPLEX
-
-    # Check for simple patterns
-    for pattern in SIMPLE_PATTERNS:
-        if pattern.search(query_lower):
-            logger.info(f"✓ SIMPLE pattern matched: {pattern.pattern}")
-            return QueryComplexity.SIMPLE
+    if not COMPLEX_TRIGGERS.isdisjoint(words):
+        logger.info("✓ COMPLEX trigger word matched")
+        return QueryComplexity.COMPLEX
 
-    # Word count heuristic
+    matched = COMPLEX_MATCHER(query_lower) if _may_match(COMPLEX_PREFILTER, query_lower) else None
+    if matched:
+        logger.info("✓ COMPLEX pattern matched: %s", matched)
+        return QueryComplexity.COMPLEX
+
+    # Short queries are SIMPLE whether or not a simple pattern matches,
+    # so only longer ones need the simple checks below
     if word_count <= 10:
-        logger.info(f"✓ SIMPLE (≤10 words)")
+        logger.info("✓ SIMPLE (≤10 words)")
         return QueryComplexity.SIMPLE
-    elif word_count > 15:
-        logger.info(f"✓ COMPLEX (>15 words)")
+
+    # Queries over 20 words are routed COMPLEX without any simple check (trigger words or
+    # phrases): a passing "what" or "turn on" in a long request doesn't make it a one-shot command
+    if word_count <= 20:
+        if not SIMPLE_TRIGGERS.isdisjoint(words):
+            logger.info("✓ SIMPLE trigger word matched")
+            return QueryComplexity.SIMPLE
+
+        matched = SIMPLE_MATCHER(query_lower) if _may_match(SIMPLE_PREFILTER, query_lower) else None
+        if matched:
+            logger.info("✓ SIMPLE pattern matched: %s", matched)
+            return QueryComplexity.SIMPLE
+
+    # Word count heuristic
+    if word_count > 15:
+        logger.info("✓ COMPLEX (>15 words)")
         return QueryComplexity.COMPLEX
 
     # Default: SIMPLE
-    logger.info(f"✓ SIMPLE (default)")
+    logger.info("✓ SIMPLE (default)")
     return QueryComplexity.SIMPLE
 
+REASONING_WORDS = COMPLEX_TRIGGERS | {
+    "because", "plan", "how", "should", "difference", "between", "recommend",
+    "summarize", "if", "then", "versus", "vs", "pros", "cons",
+}
+COMMAND_WORDS = SIMPLE_TRIGGERS | {"turn", "set", "on", "off", "dim", "start"}
+CONJUNCTIONS = frozenset({"and", "or", "but", "so", "while", "after", "before"})
+
+# Hand-fit starting point: long queries with reasoning words lean COMPLEX, short
+# device commands lean SIMPLE
+DEFAULT_ROUTER_WEIGHTS = {
+    "bias": -2.5,
+    "weights": {
+        "words": 0.12,
+        "chars": 0.002,
+        "questions": 0.3,
+        "commas": 0.3,
+        "reasoning": 2.2,
+        "commands": -1.2,
+        "conjunctions": 0.4,
+    },
+}
+
+def _load_router_weights() -> Dict[str, Any]:
+    """Router coefficients from ROUTER_WEIGHTS, falling back to the built-in ones"""
+    if not ROUTER_WEIGHTS:
+        return DEFAULT_ROUTER_WEIGHTS
+    try:
+        with open(ROUTER_WEIGHTS, "rb") as f:
+            loaded = orjson.loads(f.read())
+        return {"bias": float(loaded["bias"]),
+                "weights": {k: float(v) for k, v in loaded["weights"].items()}}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning("Could not load router weights from %s, using defaults: %s", ROUTER_WEIGHTS, e)
+        return DEFAULT_ROUTER_WEIGHTS
+
+ROUTER_COEFFICIENTS = _load_router_weights()
+
+def complexity_features(query_lower: str) -> Dict[str, float]:
+    """Cheap lexical features for the logistic router"""
+    words = [w.strip(".,!?;:") for w in query_lower.split()]
+    return {
+        "words": len(words),
+        "chars": len(query_lower),
+        "questions": query_lower.count("?"),
+        "commas": query_lower.count(","),
+        "reasoning": sum(w in REASONING_WORDS for w in words),
+        "commands": sum(w in COMMAND_WORDS for w in words),
+        "conjunctions": sum(w in CONJUNCTIONS for w in words),
+    }
+
+@lru_cache(maxsize=4096)
+def complexity_probability(query_lower: str) -> float:
+    """P(complex) for a normalized query under the logistic router"""
+    weights = ROUTER_COEFFICIENTS["weights"]
+    z = ROUTER_COEFFICIENTS["bias"] + sum(
+        weights.get(name, 0.0) * value for name, value in complexity_features(query_lower).items()
+    )
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)  # the mirrored form can't overflow on very negative scores
+    return e / (1.0 + e)
+
+async def coalesce_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Merge upstream ndjson chunks until the stream goes idle for STREAM_COALESCE_MS
+
+    Only complete lines are flushed early, so each write stays valid ndjson.
+    """
+    if STREAM_COALESCE_MS <= 0:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    idle = STREAM_COALESCE_MS / 1000
+    iterator = chunks.__aiter__()
+    buffer = bytearray()
+    # The next read stays in flight across timeouts; cancelling it would drop data
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            cut = buffer.rfind(b"\n") + 1
+            if cut and (len(buffer) >= STREAM_COALESCE_MAX
+                        or not (await asyncio.wait((pending,), timeout=idle))[0]):
+                yield bytes(buffer[:cut])
+                del buffer[:cut]
+                continue
+            try:
+                buffer += await pending
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+# An empty chat makes Ollama load the model without generating anything
+HERMES_WARMUP_BODY = orjson.dumps({"model": HERMES_MODEL, "messages": []})
+
+async def warm_hermes():
+    """Load Hermes ahead of the personality hop; failures only cost the head start"""
+    try:
+        await ollama_client.post("/api/chat", content=HERMES_WARMUP_BODY, headers=JSON_HEADERS)
+    except httpx.HTTPError as e:
+        logger.debug("Hermes warmup failed: %s", e)
+
+def hermes_handoff_messages(user_query: str, analysis: str) -> List[Dict[str, str]]:
+    """Messages asking Hermes to rephrase Qwen's analysis in the GLaDOS voice"""
+    return [
+        {
+            "role": "system",
+            "content": "You are GLaDOS. Rephrase the following analysis in your characteristic sarcastic, witty voice. Maintain the factual content but add your personality."
+        },
+        {
+            "role": "user",
+            "content": f"Original question: {user_query}\n\nAnalysis to rephrase: {analysis}"
+        }
+    ]
+
+async def stream_qwen_analysis(qwen_body: Dict[str, Any], first_sentence: asyncio.Future) -> str:
+    """Stream Qwen's analysis, resolving first_sentence once one is complete; returns the full text"""
+    parts = []
+    try:
+        async with stream_session.post(
+            f"{OLLAMA_CHAT_URL}/api/chat",
+            data=orjson.dumps(qwen_body),
+            headers=JSON_HEADERS
+        ) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                chunk = orjson.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(chunk["error"])
+                parts.append(chunk.get("message", {}).get("content", ""))
+                if not first_sentence.done():
+                    text = "".join(parts)
+                    match = FIRST_SENTENCE_RE.search(text)
+                    if match:
+                        first_sentence.set_result(text[:match.end()])
+    except Exception as e:
+        if not first_sentence.done():
+            first_sentence.set_exception(e)
+        raise
+    text = "".join(parts)
+    if not first_sentence.done():
+        first_sentence.set_result(text)
+    return text
+
+async def stream_hermes_lines(messages: List[Dict[str, str]]):
+    """Yield (raw line, decoded chunk) pairs from a streamed Hermes chat"""
+    async with stream_session.post(
+        f"{OLLAMA_CHAT_URL}/api/chat",
+        data=orjson.dumps({"model": HERMES_MODEL, "messages": messages, "stream": True}),
+        headers=JSON_HEADERS
+    ) as response:
+        async for line in response.content:
+            if line.strip():
+                yield line, orjson.loads(line)
+
+async def stream_complex_pipelined(user_query: str, qwen_body: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """COMPLEX streaming where Hermes rewrites Qwen's first sentence while Qwen is still generating
+
+    Hermes' done line is held back until Qwen has finished; any remaining analysis is
+    rewritten as a continuation of what Hermes already said.
+    """
+    first_sentence = asyncio.get_running_loop().create_future()
+    qwen = asyncio.create_task(stream_qwen_analysis(qwen_body, first_sentence))
+    try:
+        try:
+            head = await first_sentence
+        except Exception as e:
+            logger.error("Qwen analysis failed: %s", e)
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+            return
+
+        messages = hermes_handoff_messages(user_query, head)
+        said = []
+        done_line = None
+        async for line, chunk in stream_hermes_lines(messages):
+            if chunk.get("done"):
+                done_line = line
+                continue
+            said.append(chunk.get("message", {}).get("content", ""))
+            yield line
+
+        try:
+            rest = (await qwen)[len(head):].strip()
+        except Exception as e:
+            logger.warning("Qwen analysis failed after its first sentence: %s", e)
+            rest = ""
+        if not rest:
+            if done_line is not None:
+                yield done_line
+            return
+
+        said_text = "".join(said)
+        messages += [
+            {"role": "assistant", "content": said_text},
+            {"role": "user", "content": f"Continue in the same voice with the rest of the analysis: {rest}"}
+        ]
+        # Keep a space between the two replies so they read as one answer
+        pad = bool(said_text) and not said_text[-1].isspace()
+        async for line, chunk in stream_hermes_lines(messages):
+            content = chunk.get("message", {}).get("content")
+            if pad and content:
+                pad = False
+                if not content[0].isspace():
+                    chunk["message"]["content"] = " " + content
+                    line = orjson.dumps(chunk) + b"\n"
+            yield line
+    finally:
+        qwen.cancel()
+
+class SemanticCache:
+    """SIMPLE-route replies reused for near-identical last user messages in the same context"""
+
+    def __init__(self, size: int, ttl: float, threshold: float):
+        self.size = size
+        self.ttl = ttl
+        self.threshold = threshold
+        # id -> (expires_at, context digest, unit embedding, reply)
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cacheable(body: Dict[str, Any]) -> bool:
+        """Only deterministic requests ending in a user message are cached"""
+        messages = body.get("messages") or []
+        return ((body.get("options") or {}).get("temperature") == 0
+                and bool(messages) and messages[-1].get("role") == "user")
+
+    async def key(self, body: Dict[str, Any]) -> Optional[tuple]:
+        """(context digest, unit embedding of the last user message), or None if embedding fails"""
+        messages = body["messages"]
+        context = hashlib.sha256(orjson.dumps(
+            [body.get("model"), body.get("options"), body.get("tools"), messages[:-1]]
+        )).digest()
+        try:
+            response = await ollama_client.post(
+                "/api/embed",
+                content=orjson.dumps({"model": SEMANTIC_CACHE_EMBED_MODEL, "input": messages[-1].get("content", "")}),
+                headers=JSON_HEADERS
+            )
+            response.raise_for_status()
+            vector = np.asarray(orjson.loads(response.content)["embeddings"][0], dtype=np.float32)
+        except Exception as e:
+            logger.warning("Semantic cache embedding failed: %s", e)
+            return None
+        norm = float(np.linalg.norm(vector))
+        return (context, vector / norm) if norm else None
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        context, vector = key
+        now = time.monotonic()
+        best, best_score = None, self.threshold
+        for entry_id, (expires_at, entry_context, entry_vector, _) in list(self.entries.items()):
+            if expires_at <= now:
+                del self.entries[entry_id]
+            elif entry_context == context:
+                score = float(entry_vector @ vector)
+                if score >= best_score:
+                    best, best_score = entry_id, score
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(best)
+        return self.entries[best][3]
+
+    def set(self, key: tuple, reply: Dict[str, Any]):
+        if reply.get("message", {}).get("tool_calls"):
+            return  # tool trajectories depend on live state
+        self.next_id += 1
+        self.entries[self.next_id] = (time.monotonic() + self.ttl, key[0], key[1], reply)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+class ExactReplyCache:
+    """TTL + LRU cache of SIMPLE-route replies keyed by a hash of the whole request"""
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        # sha256 hex -> (expires_at, reply)
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(body: Dict[str, Any]) -> str:
+        return hashlib.sha256(orjson.dumps(
+            {"model": body.get("model"), "messages": body.get("messages"),
+             "tools": body.get("tools"), "options": body.get("options")},
+            option=orjson.OPT_SORT_KEYS
+        )).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, reply: Dict[str, Any]):
+        if reply.get("message", {}).get("tool_calls"):
+            return  # tool trajectories depend on live state
+        self.entries[key] = (time.monotonic() + self.ttl, reply)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+reply_cache = ExactReplyCache(REPLY_CACHE_SIZE, REPLY_CACHE_TTL) if REPLY_CACHE_ENABLED else None
+
+semantic_cache: Optional[SemanticCache] = None
+if SEMANTIC_CACHE_ENABLED:
+    # numpy is only imported when the cache is on, so workers without it skip the import cost
+    try:
+        import numpy as np  # cosine similarity for the semantic reply cache
+    except ImportError:
+        logger.warning("SEMANTIC_CACHE_ENABLED is set but numpy is not installed; semantic cache disabled")
+    else:
+        semantic_cache = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_THRESHOLD)
+
+def cached_reply_response(reply: Dict[str, Any], stream: bool) -> Response:
+    """Return a cached final chat reply; streaming clients get it as one done=true line"""
+    if stream:
+        return Response(content=orjson.dumps(reply) + b"\n", media_type="application/x-ndjson")
+    return Response(content=orjson.dumps(reply), media_type="application/json")
+
+async def capture_ndjson(chunks: AsyncIterator[bytes], on_reply: Callable[[Dict[str, Any]], None]) -> AsyncIterator[bytes]:
+    """Relay a streamed chat unchanged, then hand the assembled final reply to on_reply"""
+    raw = bytearray()
+    async for chunk in chunks:
+        raw += chunk
+        yield chunk
+    content = []
+    final = None
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        data = orjson.loads(line)
+        message = data.get("message") or {}
+        if message.get("tool_calls"):
+            return
+        content.append(message.get("content", ""))
+        if data.get("done"):
+            final = data
+    if final is not None:
+        final["message"] = {**(final.get("message") or {}), "role": "assistant", "content": "".join(content)}
+        on_reply(final)
+
 # Helper functions for memory integration
+async def search_memory(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Single memory search against Letta Bridge (raises on failure)"""
+    response = await letta_client.get("/memory/search", params={"q": query, "k": limit})
+    response.raise_for_status()
+    return orjson.loads(response.content)  # Returns list directly
+
+class MemorySearchBatcher:
+    """Coalesces concurrent memory searches into one POST /memory/search_batch per window
+
+    Falls back to individual searches if the bridge has no batch endpoint.
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batch_supported = True
+        self.dispatches: set = set()
+        self.worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.worker = asyncio.create_task(self._collect())
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    async def submit(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, limit, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            dispatch = asyncio.create_task(self._dispatch(batch))
+            self.dispatches.add(dispatch)
+            dispatch.add_done_callback(self.dispatches.discard)
+
+    async def _dispatch(self, batch):
+        by_limit: Dict[int, list] = {}
+        for query, limit, future in batch:
+            by_limit.setdefault(limit, []).append((query, future))
+        await asyncio.gather(*(self._search(limit, items) for limit, items in by_limit.items()))
+
+    async def _search(self, limit: int, items: list):
+        try:
+            if self.batch_supported:
+                response = await letta_client.post(
+                    "/memory/search_batch",
+                    content=orjson.dumps({"queries": [query for query, _ in items], "k": limit}),
+                    headers=JSON_HEADERS
+                )
+                if response.status_code in (404, 405):
+                    logger.warning("Letta Bridge has no /memory/search_batch, using single searches")
+                    self.batch_supported = False
+                elif response.status_code == 422:
+                    logger.warning("Letta Bridge rejected a batch of %d queries, using single searches", len(items))
+                else:
+                    response.raise_for_status()
+                    for (_, future), memories in zip(items, orjson.loads(response.content)):
+                        if not future.done():
+                            future.set_result(memories)
+                    return
+
+            results = await asyncio.gather(
+                *(search_memory(query, limit) for query, _ in items), return_exceptions=True
+            )
+            for (_, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+
+memory_batcher: Optional[MemorySearchBatcher] = None
+
+async def fetch_memories(query: str, limit: int) -> List[Dict[str, Any]]:
+    """Search Letta Bridge, through the batcher when enabled"""
+    if memory_batcher is not None:
+        return await memory_batcher.submit(query, limit)
+    return await search_memory(query, limit)
+
+# (query, limit) -> (expires_at, generation, memories); save_memory bumps the generation
+memory_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+memory_inflight: Dict[tuple, asyncio.Future] = {}
+memory_generation = 0
+
+async def cached_memory_search(query: str, limit: int) -> List[Dict[str, Any]]:
+    """fetch_memories with a TTL/LRU cache and single-flight for identical concurrent searches"""
+    key = (query, limit)
+    entry = memory_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic() and entry[1] == memory_generation:
+        memory_cache.move_to_end(key)
+        return entry[2]
+
+    inflight = memory_inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    memory_inflight[key] = future
+    generation = memory_generation
+    try:
+        memories = await fetch_memories(query, limit)
+    except BaseException as e:
+        # Waiters get a plain error even if this request was cancelled
+        future.set_exception(e if isinstance(e, Exception) else RuntimeError("memory search cancelled"))
+        future.exception()  # mark retrieved when nobody else was waiting
+        raise
+    finally:
+        memory_inflight.pop(key, None)
+    future.set_result(memories)
+
+    if generation == memory_generation:
+        memory_cache[key] = (time.monotonic() + LETTA_CACHE_TTL, generation, memories)
+        memory_cache.move_to_end(key)
+        if len(memory_cache) > LETTA_CACHE_SIZE:
+            memory_cache.popitem(last=False)
+    return memories
+
 async def retrieve_memory(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     """Retrieve relevant memories from Letta Bridge"""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{LETTA_BRIDGE_URL}/memory/search",
-                params={"q": query, "k": limit},
-                headers={"x-api-key": LETTA_API_KEY}
-            )
-            response.raise_for_status()
-            memories = response.json()  # Returns list directly
-            logger.info(f"Retrieved {len(memories)} memories for query: {query[:50]}...")
-            return memories
+        if LETTA_CACHE_TTL > 0:
+            memories = await cached_memory_search(query, limit)
+        else:
+            memories = await fetch_memories(query, limit)
+        logger.info("Retrieved %s memories for query: %s...", len(memories), query[:50])
+        return memories
     except Exception as e:
-        logger.warning(f"Failed to retrieve memories: {e}")
+        logger.warning("Failed to retrieve memories: %s", e)
         return []
 
 async def save_memory(title: str, content: str, tier: str = "short"):
     """Save interaction to Letta Bridge memory"""
+    global memory_generation
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.post(
-                f"{LETTA_BRIDGE_URL}/memory/add",
-                json={
-                    "type": "conversation",
-                    "title": title,
-                    "content": content,
-                    "tier": tier,
-                    "tags": ["assistant", "conversation"],
-                    "confidence": 0.8,
-                    "generate_embedding": True
-                },
-                headers={"x-api-key": LETTA_API_KEY}
-            )
-            logger.debug(f"Saved memory: {title}")
+        await letta_client.post(
+            "/memory/add",
+            content=orjson.dumps({
+                "type": "conversation",
+                "title": title,
+                "content": content,
+                "tier": tier,
+                "tags": ["assistant", "conversation"],
+                "confidence": 0.8,
+                "generate_embedding": True
+            }),
+            headers=JSON_HEADERS
+        )
+        # Cached searches may not include the new memory
+        memory_generation += 1
+        logger.debug("Saved memory: %s", title)
     except Exception as e:
-        logger.warning(f"Failed to save memory: {e}")
+        logger.warning("Failed to save memory: %s", e)
 
 # Tool Endpoints
 
-@app.get("/tool/list")
+@app.get("/tool/list", response_model=None)
 async def list_tools():
     """List all available tools in Ollama function calling format"""
-    return {
-        "tools": TOOL_DEFINITIONS,
-        "version": "2.2.0",
-        "description": "GLaDOS Orchestrator Tool Provider"
-    }
+    return Response(content=TOOL_LIST_JSON, media_type="application/json")
+
+_time_tick: Optional[int] = None
+_time_result: Dict[str, str] = {}
+_time_body = b""
 
-@app.get("/tool/get_time")
-@app.post("/tool/get_time")
+@app.api_route("/tool/get_time", methods=["GET", "POST"], response_model=ToolResponse)
 async def get_time():
     """Get the current date and time"""
+    global _time_tick, _time_result, _time_body
     try:
-        now = datetime.now()
-        result = {
-            "datetime": now.isoformat(),
-            "date": now.strftime("%Y-%m-%d"),
-            "time": now.strftime("%H:%M:%S"),
-            "day_of_week": now.strftime("%A"),
-            "formatted": now.strftime("%A, %B %d, %Y at %I:%M %p")
-        }
-        logger.info(f"get_time called: {result['formatted']}")
-        return ToolResponse(success=True, data=result)
+        # Format and encode once per wall-clock second; bursts of tool calls reuse the bytes
+        ts = time.time()
+        if int(ts) != _time_tick:
+            now = datetime.fromtimestamp(ts)
+            _time_result = {
+                "datetime": now.isoformat(),
+                "date": now.strftime("%Y-%m-%d"),
+                "time": now.strftime("%H:%M:%S"),
+                "day_of_week": now.strftime("%A"),
+                "formatted": now.strftime("%A, %B %d, %Y at %I:%M %p")
+            }
+            _time_body = orjson.dumps({"success": True, "data": _time_result, "error": None})
+            _time_tick = int(ts)
+        logger.info("get_time called: %s", _time_result['formatted'])
+        return Response(content=_time_body, media_type="application/json")
     except Exception as e:
-        logger.error(f"Error in get_time: {str(e)}")
-        return ToolResponse(success=False, error=str(e))
+        logger.error("Error in get_time: %s", e)
+        return tool_response(error=str(e))
 
-@app.post("/tool/letta_query")
+@app.post("/tool/letta_query", response_model=ToolResponse)
 async def letta_query(request: LettaQueryRequest):
     """Query the Letta memory system for relevant information"""
     try:
-        logger.info(f"letta_query called with query: {request.query}")
+        logger.info("letta_query called with query: %s", request.query)
         memories = await retrieve_memory(request.query, request.limit)
 
         result = {
@@ -279,16 +1251,16 @@ async def letta_query(request: LettaQueryRequest):
                 "score": mem.get("score", 0.0)
             })
 
-        return ToolResponse(success=True, data=result)
+        return tool_response(result)
     except Exception as e:
-        logger.error(f"Error in letta_query: {str(e)}")
-        return ToolResponse(success=False, error=str(e))
+        logger.error("Error in letta_query: %s", e)
+        return tool_response(error=str(e))
 
-@app.post("/tool/execute_ha_skill")
+@app.post("/tool/execute_ha_skill", response_model=ToolResponse)
 async def execute_ha_skill(request: HASkillRequest):
     """Execute a Home Assistant skill or automation"""
     try:
-        logger.info(f"execute_ha_skill called: {request.skill_name} with params: {request.parameters}")
+        logger.info("execute_ha_skill called: %s with params: %s", request.skill_name, request.parameters)
 
         # Placeholder for HA skill execution
         # In production, this would integrate with Home Assistant's service API
@@ -299,23 +1271,242 @@ async def execute_ha_skill(request: HASkillRequest):
             "message": "HA skill execution not yet implemented. This endpoint is ready for integration."
         }
 
-        return ToolResponse(success=True, data=result)
+        return tool_response(result)
     except Exception as e:
-        logger.error(f"Error in execute_ha_skill: {str(e)}")
-        return ToolResponse(success=False, error=str(e))
+        logger.error("Error in execute_ha_skill: %s", e)
+        return tool_response(error=str(e))
+
+# Immediate acknowledgement for the SSE tool variants, sent before the backend call
+TOOL_ACKNOWLEDGEMENTS = {
+    "get_time": "Checking the time.",
+    "letta_query": "Searching memory.",
+    "execute_ha_skill": "Running the Home Assistant skill.",
+}
+
+# tool name -> (request model or None, handler)
+TOOL_HANDLERS = {
+    "get_time": (None, get_time),
+    "letta_query": (LettaQueryRequest, letta_query),
+    "execute_ha_skill": (HASkillRequest, execute_ha_skill),
+}
+
+@app.api_route("/tool/{name}/stream", methods=["GET", "POST"], response_model=None)
+async def stream_tool(name: str, request: Request):
+    """Run a tool as server-sent events: an ack event at once, then the ToolResponse as result"""
+    if name not in TOOL_HANDLERS:
+        raise HTTPException(status_code=404, detail=f"Unknown tool: {name}")
+    model, handler = TOOL_HANDLERS[name]
+    args = ()
+    if model is not None:
+        try:
+            args = (model.model_validate_json(await request.body()),)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=orjson.loads(e.json()))
+
+    async def events():
+        yield b"data: " + orjson.dumps({"ack": TOOL_ACKNOWLEDGEMENTS[name]}) + b"\n\n"
+        response = await handler(*args)
+        # The handlers return encoded ToolResponse bodies; splice them in as-is
+        yield b'data: {"result":' + response.body + b"}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def run_tool_call(call: ToolCall) -> bytes:
+    """One batch entry: the tool's encoded ToolResponse, or an error ToolResponse"""
+    if call.name not in TOOL_HANDLERS:
+        return tool_response(error=f"Unknown tool: {call.name}").body
+    model, handler = TOOL_HANDLERS[call.name]
+    try:
+        args = (model.model_validate(call.arguments),) if model is not None else ()
+    except ValidationError as e:
+        return tool_response(error=str(e)).body
+    return (await handler(*args)).body
+
+@app.post("/tool/batch", response_model=None)
+async def tool_batch(request: ToolBatchRequest):
+    """Run several tool calls concurrently; responses come back in call order"""
+    bodies = await asyncio.gather(*(run_tool_call(call) for call in request.calls))
+    return Response(content=b"[" + b",".join(bodies) + b"]", media_type="application/json")
 
 # Smart Routing Endpoints
 
+async def route_simple(body: Dict[str, Any], messages: List[Dict[str, Any]]) -> Response:
+    """SIMPLE route: straight to Hermes with the GLaDOS system message"""
+    logger.info("🎯 ROUTING: SIMPLE → %s (direct)", HERMES_MODEL)
+
+    # Override model in request
+    body["model"] = HERMES_MODEL
+
+    # Inject GLaDOS personality (replace HA's system message if present)
+    # HA often sends "You are a helpful assistant" which overrides model personality
+    # messages belongs to this request's freshly decoded body, so edit it in place
+    if messages and messages[0].get("role") == "system":
+        # Replace HA's system message with GLaDOS personality
+        messages[0] = GLADOS_SYSTEM_MSG
+        logger.debug("Replaced HA system message with GLaDOS personality")
+    else:
+        # No system message, add GLaDOS personality
+        messages.insert(0, GLADOS_SYSTEM_MSG)
+        logger.debug("Injected GLaDOS personality for simple query")
+    body["messages"] = messages
+
+    exact_key = cache_key = None
+    if SemanticCache.cacheable(body):
+        if reply_cache is not None:
+            exact_key = reply_cache.key(body)
+            reply = reply_cache.get(exact_key)
+            if reply is not None:
+                logger.info("♻️  Exact cache hit for SIMPLE query")
+                return cached_reply_response(reply, body.get("stream", False))
+        if semantic_cache is not None:
+            cache_key = await semantic_cache.key(body)
+            if cache_key is not None:
+                reply = semantic_cache.get(cache_key)
+                if reply is not None:
+                    logger.info("♻️  Semantic cache hit for SIMPLE query")
+                    if exact_key is not None:
+                        reply_cache.set(exact_key, reply)
+                    return cached_reply_response(reply, body.get("stream", False))
+
+    def remember(reply: Dict[str, Any]):
+        if exact_key is not None:
+            reply_cache.set(exact_key, reply)
+        if cache_key is not None:
+            semantic_cache.set(cache_key, reply)
+    caching = exact_key is not None or cache_key is not None
+
+    # Check if streaming
+    if body.get("stream", False):
+        # Stream response through the shared client
+        async def stream_proxy():
+            async with stream_session.post(
+                f"{OLLAMA_CHAT_URL}/api/chat",
+                data=orjson.dumps(body),
+                headers=JSON_HEADERS
+            ) as response:
+                chunks = coalesce_ndjson(response.content.iter_any())
+                if caching and response.status == 200:
+                    chunks = capture_ndjson(chunks, remember)
+                async for chunk in chunks:
+                    yield chunk
+
+        return StreamingResponse(
+            stream_proxy(),
+            media_type="application/x-ndjson"
+        )
+    else:
+        # Regular response
+        response = await ollama_client.post(
+            "/api/chat",
+            content=orjson.dumps(body),
+            headers=JSON_HEADERS
+        )
+        if caching and response.status_code == 200:
+            remember(orjson.loads(response.content))
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type="application/json"
+        )
+
+async def route_complex(body: Dict[str, Any], user_query: str) -> Response:
+    """COMPLEX route: Qwen analyses, Hermes rephrases in the GLaDOS voice"""
+    logger.info("🎯 ROUTING: COMPLEX → %s (background) → %s (voice)", QWEN_MODEL, HERMES_MODEL)
+
+    if COMPLEX_PIPELINE and body.get("stream", False):
+        qwen_body = {**body, "model": QWEN_MODEL, "stream": True}
+        return StreamingResponse(
+            stream_complex_pipelined(user_query, qwen_body),
+            media_type="application/x-ndjson"
+        )
+
+    # Step 1: Send to Qwen for analysis (force non-streaming for handoff)
+    qwen_body = body.copy()
+    qwen_body["model"] = QWEN_MODEL
+    qwen_body["stream"] = False  # Force non-streaming for handoff
+
+    warmup = asyncio.create_task(warm_hermes()) if HERMES_WARMUP else None
+
+    logger.debug("Querying Qwen for analysis...")
+    qwen_response = await ollama_client.post(
+        "/api/chat",
+        content=orjson.dumps(qwen_body),
+        headers=JSON_HEADERS
+    )
+    qwen_response.raise_for_status()
+    qwen_data = orjson.loads(qwen_response.content)
+
+    # Extract Qwen's response
+    qwen_content = qwen_data.get("message", {}).get("content", "")
+    logger.debug("Qwen response: %s...", qwen_content[:100])
+
+    if (SKIP_HERMES_REWRITE_UNDER
+            and len(qwen_content.split()) < SKIP_HERMES_REWRITE_UNDER
+            and not HERMES_REWRITE_REQUIRED_RE.search(qwen_content)):
+        logger.info("⏩ Qwen answer under %d words, skipping Hermes rewrite", SKIP_HERMES_REWRITE_UNDER)
+        if body.get("stream", False):
+            # Qwen's final reply is already a valid done=true stream line
+            return Response(content=qwen_response.content.rstrip() + b"\n", media_type="application/x-ndjson")
+        return Response(content=qwen_response.content, media_type="application/json")
+
+    # Step 2: Send Qwen's analysis to Hermes for GLaDOS personality
+    hermes_messages = hermes_handoff_messages(user_query, qwen_content)
+
+    hermes_body = {
+        "model": HERMES_MODEL,
+        "messages": hermes_messages,
+        "stream": body.get("stream", False)  # Match original streaming preference
+    }
+
+    logger.debug("Sending to Hermes for personality handoff...")
+    if warmup is not None:
+        # Usually long done; otherwise the remaining load would be paid by the Hermes call anyway
+        await warmup
+
+    # Check if streaming
+    if hermes_body.get("stream", False):
+        # Stream Hermes response
+        async def stream_hermes():
+            async with stream_session.post(
+                f"{OLLAMA_CHAT_URL}/api/chat",
+                data=orjson.dumps(hermes_body),
+                headers=JSON_HEADERS
+            ) as response:
+                async for chunk in coalesce_ndjson(response.content.iter_any()):
+                    yield chunk
+
+        return StreamingResponse(
+            stream_hermes(),
+            media_type="application/x-ndjson"
+        )
+    else:
+        # Regular Hermes response
+        hermes_response = await ollama_client.post(
+            "/api/chat",
+            content=orjson.dumps(hermes_body),
+            headers=JSON_HEADERS
+        )
+        return Response(
+            content=hermes_response.content,
+            status_code=hermes_response.status_code,
+            media_type="application/json"
+        )
+
 @app.api_route("/api/chat", methods=["POST"])
 async def chat_with_routing(request: Request):
     """Smart routing for chat requests with Hermes personality handoff"""
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
 
         # Extract user query from messages
         messages = body.get("messages", [])
         user_query = ""
-        for msg in reversed(messages):
+        for i in range(len(messages) - 1, -1, -1):
+            msg = messages[i]
             if msg.get("role") == "user":
                 user_query = msg.get("content", "")
                 break
@@ -329,133 +1520,11 @@ async def chat_with_routing(request: Request):
 
         # Route based on complexity
         if complexity == QueryComplexity.SIMPLE:
-            # Simple query: Direct to Hermes (fast path)
-            target_model = HERMES_MODEL
-            target_url = OLLAMA_CHAT_URL
-            logger.info(f"🎯 ROUTING: SIMPLE → {HERMES_MODEL} (direct)")
-
-            # Override model in request
-            body["model"] = target_model
-
-            # Inject GLaDOS personality (replace HA's system message if present)
-            # HA often sends "You are a helpful assistant" which overrides model personality
-            glados_system_msg = {
-                "role": "system",
-                "content": "You are GLaDOS, the sarcastic AI from Portal. You are witty, intelligent, and occasionally passive-aggressive. You help with tasks while maintaining your characteristic dry humor."
-            }
-
-            if messages and messages[0].get("role") == "system":
-                # Replace HA's system message with GLaDOS personality
-                body["messages"] = [glados_system_msg] + messages[1:]
-                logger.debug("Replaced HA system message with GLaDOS personality")
-            else:
-                # No system message, add GLaDOS personality
-                body["messages"] = [glados_system_msg] + messages
-                logger.debug("Injected GLaDOS personality for simple query")
-
-            # Check if streaming
-            if body.get("stream", False):
-                # Stream response - keep client alive during streaming
-                async def stream_proxy():
-                    async with httpx.AsyncClient(timeout=120.0) as client:
-                        async with client.stream(
-                            "POST",
-                            f"{target_url}/api/chat",
-                            json=body
-                        ) as response:
-                            async for chunk in response.aiter_bytes():
-                                yield chunk
-
-                return StreamingResponse(
-                    stream_proxy(),
-                    media_type="application/x-ndjson"
-                )
-            else:
-                # Regular response
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.post(
-                        f"{target_url}/api/chat",
-                        json=body
-                    )
-                    return Response(
-                        content=response.content,
-                        status_code=response.status_code,
-                        media_type="application/json"
-                    )
-
-        else:
-            # Complex query: Qwen → Hermes handoff for personality consistency
-            logger.info(f"🎯 ROUTING: COMPLEX → {QWEN_MODEL} (background) → {HERMES_MODEL} (voice)")
-
-            # Step 1: Send to Qwen for analysis (force non-streaming for handoff)
-            qwen_body = body.copy()
-            qwen_body["model"] = QWEN_MODEL
-            qwen_body["stream"] = False  # Force non-streaming for handoff
-
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                logger.debug(f"Querying Qwen for analysis...")
-                qwen_response = await client.post(
-                    f"{OLLAMA_CHAT_URL}/api/chat",
-                    json=qwen_body
-                )
-                qwen_response.raise_for_status()
-                qwen_data = qwen_response.json()
-
-                # Extract Qwen's response
-                qwen_content = qwen_data.get("message", {}).get("content", "")
-                logger.debug(f"Qwen response: {qwen_content[:100]}...")
-
-                # Step 2: Send Qwen's analysis to Hermes for GLaDOS personality
-                hermes_messages = [
-                    {
-                        "role": "system",
-                        "content": "You are GLaDOS. Rephrase the following analysis in your characteristic sarcastic, witty voice. Maintain the factual content but add your personality."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Original question: {user_query}\n\nAnalysis to rephrase: {qwen_content}"
-                    }
-                ]
-
-                hermes_body = {
-                    "model": HERMES_MODEL,
-                    "messages": hermes_messages,
-                    "stream": body.get("stream", False)  # Match original streaming preference
-                }
-
-                logger.debug(f"Sending to Hermes for personality handoff...")
-
-                # Check if streaming
-                if hermes_body.get("stream", False):
-                    # Stream Hermes response
-                    async def stream_hermes():
-                        async with httpx.AsyncClient(timeout=120.0) as stream_client:
-                            async with stream_client.stream(
-                                "POST",
-                                f"{OLLAMA_CHAT_URL}/api/chat",
-                                json=hermes_body
-                            ) as response:
-                                async for chunk in response.aiter_bytes():
-                                    yield chunk
-
-                    return StreamingResponse(
-                        stream_hermes(),
-                        media_type="application/x-ndjson"
-                    )
-                else:
-                    # Regular Hermes response
-                    hermes_response = await client.post(
-                        f"{OLLAMA_CHAT_URL}/api/chat",
-                        json=hermes_body
-                    )
-                    return Response(
-                        content=hermes_response.content,
-                        status_code=hermes_response.status_code,
-                        media_type="application/json"
-                    )
+            return await route_simple(body, messages)
+        return await route_complex(body, user_query)
 
     except Exception as e:
-        logger.error(f"Error in chat routing: {e}")
+        logger.error("Error in chat routing: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS"])
@@ -467,29 +1536,62 @@ async def proxy_ollama_api(request: Request, path: str):
         raise HTTPException(status_code=500, detail="Should be handled by chat_with_routing")
 
     target_url = f"{OLLAMA_CHAT_URL}/api/{path}"
-    logger.debug(f"Pass-through: {request.method} /api/{path} → {target_url}")
+    logger.debug("Pass-through: %s /api/%s → %s", request.method, path, target_url)
 
-    try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            # Forward the request
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                content=await request.body(),
-                headers={k: v for k, v in request.headers.items() if k.lower() != "host"},
-            )
-
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
+    # Stream the upload through rather than buffering it (e.g. /api/create, /api/blobs)
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
 
+    try:
+        response = await stream_session.request(
+            request.method,
+            target_url,
+            data=request.stream() if has_body else None,
+            headers=[(k, v) for k, v in request.headers.items() if k not in PROXY_SKIP_REQUEST_HEADERS],
+        )
     except Exception as e:
-        logger.error(f"Proxy error for /api/{path}: {e}")
+        logger.error("Proxy error for /api/%s: %s", path, e)
         raise HTTPException(status_code=502, detail=str(e))
 
-@app.api_route("/healthz", methods=["GET", "HEAD"])
+    async def relay():
+        try:
+            async for chunk in response.content.iter_any():
+                yield chunk
+        finally:
+            response.release()
+
+    # Relay the response as it arrives (e.g. /api/pull, /api/generate progress)
+    return StreamingResponse(
+        relay(),
+        status_code=response.status,
+        headers={k: v for k, v in response.headers.items() if k.lower() not in PROXY_SKIP_RESPONSE_HEADERS}
+    )
+
+async def probe_upstream(name: str, client: httpx.AsyncClient, url: str) -> bool:
+    """GET an upstream health URL, logging and returning False on any HTTP error"""
+    try:
+        resp = await client.get(url, timeout=5.0)
+        resp.raise_for_status()
+        return True
+    except httpx.HTTPError as e:
+        logger.warning("Health check - %s error: %s", name, e)
+        return False
+
+# Model routing is fixed at import; both info payloads share these dicts
+HEALTH_ROUTING = {"simple_model": HERMES_MODEL, "complex_model": QWEN_MODEL}
+ROUTING = {
+    "simple_queries": f"{HERMES_MODEL} (direct, fast path)",
+    "complex_queries": f"{QWEN_MODEL} (background analysis) → {HERMES_MODEL} (GLaDOS voice)"
+}
+
+LIVEZ_BODY = b'{"status":"ok"}'
+
+async def liveness(request: Request) -> Response:
+    """Liveness probe: a constant body, no dependency injection, validation or encoding"""
+    return Response(LIVEZ_BODY, media_type="application/json")
+
+app.add_route("/livez", liveness, methods=["GET", "HEAD"], include_in_schema=False)
+
+@app.api_route("/healthz", methods=["GET", "HEAD"], response_model=None)
 async def health_check():
     """Health check endpoint"""
     health_status = {
@@ -500,71 +1602,85 @@ async def health_check():
         "letta_bridge": "unknown",
         "ollama_chat": "unknown",
         "tools_available": len(TOOL_DEFINITIONS),
-        "routing": {
-            "simple_model": HERMES_MODEL,
-            "complex_model": QWEN_MODEL
-        }
+        "routing": HEALTH_ROUTING
     }
 
     try:
-        # Check if Letta Bridge is accessible
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            try:
-                resp = await client.get(
-                    f"{LETTA_BRIDGE_URL}/healthz",
-                    headers={"x-api-key": LETTA_API_KEY}
-                )
-                resp.raise_for_status()
-                health_status["letta_bridge"] = "healthy"
-            except httpx.HTTPError as e:
-                logger.warning(f"Health check - Letta Bridge error: {str(e)}")
-                health_status["letta_bridge"] = "unhealthy"
-                health_status["status"] = "degraded"
-
-            # Check Ollama connectivity
-            try:
-                resp = await client.get(f"{OLLAMA_CHAT_URL}/api/tags")
-                resp.raise_for_status()
-                health_status["ollama_chat"] = "healthy"
-            except httpx.HTTPError as e:
-                logger.warning(f"Health check - Ollama Chat error: {str(e)}")
-                health_status["ollama_chat"] = "unhealthy"
+        # Probe Letta Bridge and Ollama concurrently: latency is the slower probe, not the sum
+        probes = await asyncio.gather(
+            probe_upstream("Letta Bridge", letta_client, "/healthz"),
+            probe_upstream("Ollama Chat", ollama_client, "/api/tags")
+        )
+        for key, healthy in zip(("letta_bridge", "ollama_chat"), probes):
+            health_status[key] = "healthy" if healthy else "unhealthy"
+            if not healthy:
                 health_status["status"] = "degraded"
 
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         health_status["status"] = "unhealthy"
         health_status["error"] = str(e)
 
-    return health_status
+    # Encoded straight to orjson: no jsonable_encoder pass over a fixed-shape dict
+    return ORJSONResponse(health_status)
+
+def cache_stats(cache) -> Dict[str, Any]:
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "size": len(cache.entries), "hits": cache.hits, "misses": cache.misses}
+
+@app.get("/cache/stats", response_model=None)
+async def get_cache_stats():
+    """Hit/miss counters for the SIMPLE-route reply caches in this worker"""
+    return ORJSONResponse({
+        "exact": cache_stats(reply_cache),
+        "semantic": cache_stats(semantic_cache),
+        "memory": {"size": len(memory_cache)},
+    })
+
+@app.get("/debug/cache", response_model=None)
+async def get_debug_cache():
+    """lru_cache counters of the routing classifiers in this worker"""
+    return ORJSONResponse({
+        "detect_complexity": _detect_complexity_cached.cache_info()._asdict(),
+        "complexity_probability": complexity_probability.cache_info()._asdict(),
+    })
+
+# Service info for GET / is constant, so it is encoded once at import
+ROOT_INFO_JSON = orjson.dumps({
+    "service": "GLaDOS Orchestrator",
+    "version": "2.2.0",
+    "mode": "unified-voice-architecture",
+    "description": "Tool endpoints, intelligent routing, and personality-consistent responses for Ollama LLM",
+    "endpoints": {
+        "tools": "/tool/list",
+        "get_time": "/tool/get_time",
+        "letta_query": "/tool/letta_query",
+        "execute_ha_skill": "/tool/execute_ha_skill",
+        "tool_stream": "/tool/{name}/stream (SSE: ack, then result)",
+        "tool_batch": "/tool/batch (concurrent calls, results in order)",
+        "health": "/healthz",
+        "live": "/livez",
+        "cache_stats": "/cache/stats",
+        "chat": "/api/chat (with smart routing)",
+        "ollama_api": "/api/* (pass-through to Ollama)"
+    },
+    "routing": ROUTING,
+    "usage": "Connect Home Assistant to this orchestrator. Chat queries will be automatically routed. Tools available via function calling."
+})
 
-@app.get("/")
+@app.get("/", response_model=None)
 async def root():
     """Root endpoint with service info"""
-    return {
-        "service": "GLaDOS Orchestrator",
-        "version": "2.2.0",
-        "mode": "unified-voice-architecture",
-        "description": "Tool endpoints, intelligent routing, and personality-consistent responses for Ollama LLM",
-        "endpoints": {
-            "tools": "/tool/list",
-            "get_time": "/tool/get_time",
-            "letta_query": "/tool/letta_query",
-            "execute_ha_skill": "/tool/execute_ha_skill",
-            "health": "/healthz",
-            "chat": "/api/chat (with smart routing)",
-            "ollama_api": "/api/* (pass-through to Ollama)"
-        },
-        "routing": {
-            "simple_queries": f"{HERMES_MODEL} (direct, fast path)",
-            "complex_queries": f"{QWEN_MODEL} (background analysis) → {HERMES_MODEL} (GLaDOS voice)"
-        },
-        "usage": "Connect Home Assistant to this orchestrator. Chat queries will be automatically routed. Tools available via function calling."
-    }
+    return Response(content=ROOT_INFO_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    logger.info(f"Starting GLaDOS Orchestrator v2.2 - Unified Voice Architecture")
-    logger.info(f"Routing: SIMPLE={HERMES_MODEL} (direct), COMPLEX={QWEN_MODEL}→{HERMES_MODEL} (handoff)")
-    logger.info(f"Ollama: {OLLAMA_CHAT_URL}")
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    logger.info("Starting GLaDOS Orchestrator v2.2 - Unified Voice Architecture")
+    logger.info("Routing: SIMPLE=%s (direct), COMPLEX=%s→%s (handoff)", HERMES_MODEL, QWEN_MODEL, HERMES_MODEL)
+    logger.info("Ollama: %s (NUM_PARALLEL=%s, MAX_LOADED_MODELS=%s)",
+                OLLAMA_CHAT_URL, OLLAMA_NUM_PARALLEL, OLLAMA_MAX_LOADED_MODELS)
+    logger.info("Routing regex engine: %s, router: %s", REGEX_ENGINE, ROUTER_MODE)
+    # Multiple workers need the import string so each process can load the app
+    uvicorn.run("main:app" if WORKERS > 1 else app, host="0.0.0.0", port=PORT, workers=WORKERS,
+                loop="uvloop", http="httptools", access_log=False)
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Literal
 import uuid
@@ -6,8 +7,8 @@ import json
 
 import asyncpg
 import redis.asyncio as aioredis
-import uvicorn
 from fastapi import FastAPI, HTTPException, Depends, Header, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import numpy as np
 
@@ -19,6 +20,10 @@ REDIS_URL = os.getenv("LETTA_REDIS_URL", "redis://:CHANGE_ME_STRONG_PASSWORD_REQ
 API_KEY = os.getenv("BRIDGE_API_KEY", "dev-key")  # SECURITY: Change in production! Set BRIDGE_API_KEY in .env
 EMBED_DIM = int(os.getenv("EMBED_DIM", "1536"))    # match your pgvector dim (1536 for ada-002)
 DAILY_BRIEF_WINDOW_HOURS = int(os.getenv("DAILY_BRIEF_WINDOW_HOURS", "24"))
+# Shared connection pools, created once per process (min 0: Postgres is only dialled on first use)
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "0"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
 
 # Tier mapping: API tier names → Database tier names
 TIER_MAP = {
@@ -32,21 +37,28 @@ TIER_MAP = {
 # --------------------
 # FastAPI
 # --------------------
-app = FastAPI(title="Letta Bridge", version="0.1.0")
+pg_pool: Optional[asyncpg.Pool] = None
+redis_client: Optional[aioredis.Redis] = None
 
-async def get_pg():
-    pool = await asyncpg.create_pool(PG_DSN, min_size=1, max_size=5)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Postgres pool and Redis client once; requests borrow from them"""
+    global pg_pool, redis_client
+    pg_pool = await asyncpg.create_pool(PG_DSN, min_size=PG_POOL_MIN_SIZE, max_size=PG_POOL_MAX_SIZE)
+    redis_client = aioredis.from_url(REDIS_URL, decode_responses=True, max_connections=REDIS_MAX_CONNECTIONS)
     try:
-        yield pool
+        yield
     finally:
-        await pool.close()
+        await pg_pool.close()
+        await redis_client.close()
+
+app = FastAPI(title="Letta Bridge", version="0.1.0", default_response_class=ORJSONResponse, lifespan=lifespan)
+
+async def get_pg():
+    return pg_pool
 
 async def get_redis():
-    redis = await aioredis.from_url(REDIS_URL, decode_responses=True)
-    try:
-        yield redis
-    finally:
-        await redis.close()
+    return redis_client
 
 async def auth(x_api_key: Optional[str] = Header(default=None)):
     if API_KEY and x_api_key != API_KEY:
@@ -79,6 +91,12 @@ class ForgetIn(BaseModel):
     id: str
     reason: Optional[str] = None
 
+class SearchBatchIn(BaseModel):
+    queries: List[str] = Field(..., max_length=32)
+    k: int = 8
+    tiers: Optional[str] = None
+    types: Optional[str] = None
+
 class SearchOutItem(BaseModel):
     id: str
     title: str
@@ -187,15 +205,7 @@ async def memory_forget(body: ForgetIn, _=Depends(auth), pg=Depends(get_pg)):
         )
     return {"status":"ok","id":body.id,"tier":"short_term"}
 
-@app.get("/memory/search", response_model=List[SearchOutItem])
-async def memory_search(
-    q: str = Query(..., description="Text query"),
-    k: int = 8,
-    tiers: Optional[str] = Query(None, description="comma list e.g. short,medium,long,permanent"),
-    types: Optional[str] = Query(None, description="comma list e.g. event,fact,insight"),
-    _=Depends(auth),
-    pg=Depends(get_pg)
-):
+def _search_filters(tiers: Optional[str], types: Optional[str]):
     # Map API tier names to database tier names
     tiers_list = None
     if tiers:
@@ -203,36 +213,37 @@ async def memory_search(
         tiers_list = [TIER_MAP.get(t, t) for t in api_tiers]
 
     types_list = [t.strip() for t in types.split(",")] if types else None
+    return tiers_list, types_list
 
+async def _search(conn, q: str, k: int, tiers_list, types_list) -> List[SearchOutItem]:
     # text match + optional vector
-    async with pg.acquire() as conn:
-        # vector part
-        emb = fake_embed(q, EMBED_DIM)
-        # Convert list to pgvector format string
-        emb_str = '[' + ','.join(map(str, emb)) + ']'
-        filters = []
-        params = [emb_str]
-        if tiers_list:
-            filters.append(f"tier = ANY(${len(params)+1})")
-            params.append(tiers_list)
-        if types_list:
-            filters.append(f"type = ANY(${len(params)+1})")
-            params.append(types_list)
-        where = ("WHERE " + " AND ".join(filters)) if filters else ""
+    # vector part
+    emb = fake_embed(q, EMBED_DIM)
+    # Convert list to pgvector format string
+    emb_str = '[' + ','.join(map(str, emb)) + ']'
+    filters = []
+    params = [emb_str]
+    if tiers_list:
+        filters.append(f"tier = ANY(${len(params)+1})")
+        params.append(tiers_list)
+    if types_list:
+        filters.append(f"type = ANY(${len(params)+1})")
+        params.append(types_list)
+    where = ("WHERE " + " AND ".join(filters)) if filters else ""
 
-        rows = await conn.fetch(
-            f"""
-            SELECT mb.id, mb.title, left(mb.content, 200) AS preview, mb.type, mb.tier,
-                   mb.confidence, mb.created_at, mb.tags, mb.source,
-                   1 - (me.embedding <=> $1::vector) AS score
-            FROM memory_embeddings me
-            JOIN memory_blocks mb ON mb.id = me.memory_id
-            {where}
-            ORDER BY score DESC
-            LIMIT {k}
-            """,
-            *params
-        )
+    rows = await conn.fetch(
+        f"""
+        SELECT mb.id, mb.title, left(mb.content, 200) AS preview, mb.type, mb.tier,
+               mb.confidence, mb.created_at, mb.tags, mb.source,
+               1 - (me.embedding <=> $1::vector) AS score
+        FROM memory_embeddings me
+        JOIN memory_blocks mb ON mb.id = me.memory_id
+        {where}
+        ORDER BY score DESC
+        LIMIT {k}
+        """,
+        *params
+    )
     return [
         SearchOutItem(
             id=str(r["id"]), title=r["title"], preview=r["preview"], type=r["type"],
@@ -243,6 +254,26 @@ async def memory_search(
         for r in rows
     ]
 
+@app.get("/memory/search", response_model=List[SearchOutItem])
+async def memory_search(
+    q: str = Query(..., description="Text query"),
+    k: int = 8,
+    tiers: Optional[str] = Query(None, description="comma list e.g. short,medium,long,permanent"),
+    types: Optional[str] = Query(None, description="comma list e.g. event,fact,insight"),
+    _=Depends(auth),
+    pg=Depends(get_pg)
+):
+    tiers_list, types_list = _search_filters(tiers, types)
+    async with pg.acquire() as conn:
+        return await _search(conn, q, k, tiers_list, types_list)
+
+@app.post("/memory/search_batch", response_model=List[List[SearchOutItem]])
+async def memory_search_batch(body: SearchBatchIn, _=Depends(auth), pg=Depends(get_pg)):
+    """Run several searches on one connection; results are in query order"""
+    tiers_list, types_list = _search_filters(body.tiers, body.types)
+    async with pg.acquire() as conn:
+        return [await _search(conn, q, body.k, tiers_list, types_list) for q in body.queries]
+
 @app.get("/daily_brief")
 async def daily_brief(
     _=Depends(auth),
@@ -297,6 +328,7 @@ async def metrics():
 if __name__ == "__main__":
     import sys
     import warnings
+    import uvicorn
     
     # Production safety check
     print("=" * 70)
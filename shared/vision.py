@@ -15,14 +15,17 @@ logger = logging.getLogger(__name__)
 class VisionGatewayClient:
     """Client for querying vision-gateway service"""
 
-    def __init__(self, base_url: str = "http://vision-gateway:8088"):
+    def __init__(self, base_url: str = "http://vision-gateway:8088",
+                 session: Optional[requests.Session] = None):
         """
         Initialize Vision Gateway Client
 
         Args:
             base_url: Vision gateway service URL
+            session: Shared requests session (keep-alive pool); one is created if omitted
         """
         self.base_url = base_url.rstrip('/')
+        self.session = session or requests.Session()
         logger.info(f"Vision Gateway Client initialized: {self.base_url}")
 
     def get_latest_frame(self, source: str = "hdmi") -> Optional[Dict[str, Any]]:
@@ -36,7 +39,7 @@ class VisionGatewayClient:
             Frame data dict or None
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/latest_frame/{source}",
                 timeout=5
             )
@@ -56,7 +59,7 @@ class VisionGatewayClient:
             Detection data (benefits from today's cache implementation)
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/detections",
                 timeout=5
             )
@@ -178,7 +181,7 @@ class VisionGatewayClient:
     def health_check(self) -> bool:
         """Check if vision gateway is reachable"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/healthz",
                 timeout=3
             )
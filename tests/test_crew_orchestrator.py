@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test suite for Crew Orchestrator plan caching
+
+Tests that only plans which parse into steps are kept in the plan cache
+"""
+
+import os
+import sys
+import asyncio
+import threading
+import importlib.util
+
+import pytest
+
+pytest.importorskip("crewai")
+
+# Put the service directory on the path (for crew_tools) and load its main.py under its
+# own name, so it doesn't clash with the glados-orchestrator main imported by other tests
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "crew-orchestrator")
+sys.path.append(SERVICE_DIR)
+_spec = importlib.util.spec_from_file_location("crew_main", os.path.join(SERVICE_DIR, "main.py"))
+main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(main)
+
+CrewTask, EXECUTE_PLAN_TEMPLATE = main.CrewTask, main.EXECUTE_PLAN_TEMPLATE
+cached_plan, plan_cache = main.cached_plan, main.plan_cache
+
+UNPARSEABLE_PLAN = "I am not sure how to do that."
+
+
+def test_unparseable_plan_is_not_cached(monkeypatch):
+    """Test that a plan yielding no steps is evicted so a retry re-plans"""
+    plan_cache.clear()
+    monkeypatch.setattr(main, "PLANNER_STREAM", False)
+    monkeypatch.setattr(main, "planner_batcher", None)
+    monkeypatch.setattr(main, "run_planner", lambda template, task: UNPARSEABLE_PLAN)
+    task = CrewTask(goal="Open the quarterly report", application="Excel")
+
+    result = asyncio.run(main.run_task(task))
+    assert result["status"] == "error"
+    assert cached_plan(EXECUTE_PLAN_TEMPLATE, task) is None
+    print("✓ Unparseable plan eviction test passed")
+
+
+def test_unparseable_streamed_plan_is_not_cached(monkeypatch):
+    """Test that a streamed plan yielding no steps is never stored"""
+    plan_cache.clear()
+
+    async def stream_plan(task, step_queue):
+        step_queue.put_nowait(None)
+        return UNPARSEABLE_PLAN
+
+    monkeypatch.setattr(main, "PLANNER_STREAM", True)
+    monkeypatch.setattr(main, "stream_plan", stream_plan)
+    task = CrewTask(goal="Open the quarterly report", application="Excel")
+
+    result = asyncio.run(main.run_task(task))
+    assert result["status"] == "error"
+    assert cached_plan(EXECUTE_PLAN_TEMPLATE, task) is None
+    print("✓ Unparseable streamed plan test passed")
+
+
+def test_concurrent_planner_calls_use_separate_crews(monkeypatch):
+    """Test that a second planner call for a busy template gets its own crew"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    class BlockingCrew:
+        def kickoff(self, inputs):
+            barrier.wait()  # Both calls must be inside kickoff at once
+            return "Step 1: voice_command='Open Excel' verification='Is Excel open?'"
+
+    monkeypatch.setitem(main.PLANNING_CREWS, EXECUTE_PLAN_TEMPLATE, [BlockingCrew()])
+    monkeypatch.setattr(main, "build_planning_crew", lambda template, expected_output: BlockingCrew())
+    task = CrewTask(goal="Open the quarterly report", application="Excel")
+
+    async def plan_twice():
+        return await asyncio.gather(
+            asyncio.to_thread(main.run_planner, EXECUTE_PLAN_TEMPLATE, task),
+            asyncio.to_thread(main.run_planner, EXECUTE_PLAN_TEMPLATE, task),
+        )
+
+    plans = asyncio.run(plan_twice())
+    assert all(plan.startswith("Step 1:") for plan in plans)
+    assert len(main.PLANNING_CREWS[EXECUTE_PLAN_TEMPLATE]) == 2
+    print("✓ Concurrent planner crews test passed")
@@ -14,6 +14,7 @@ from datetime import datetime
 sys.path.insert(0, '/home/runner/work/HAssistant/HAssistant/services/glados-orchestrator')
 
 from main import app, list_tools, get_time, letta_query, LettaQueryRequest
+from main import detect_complexity, QueryComplexity, complexity_probability
 from fastapi.testclient import TestClient
 
 client = TestClient(app)
@@ -43,6 +44,14 @@ def test_health_check():
     print("✓ Health check test passed")
 
 
+def test_liveness():
+    """Test the liveness endpoint returns a constant body"""
+    response = client.get("/livez")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    print("✓ Liveness test passed")
+
+
 def test_list_tools():
     """Test the tool list endpoint"""
     response = client.get("/tool/list")
@@ -139,6 +148,83 @@ def test_tool_definitions_format():
     print("✓ Tool definitions format test passed")
 
 
+def test_detect_complexity_routing():
+    """Test that the combined routing regexes classify queries like the per-pattern loop"""
+    assert detect_complexity("Turn on the kitchen lights") == QueryComplexity.SIMPLE
+    assert detect_complexity("hello there") == QueryComplexity.SIMPLE
+    assert detect_complexity("Plan my week around the dentist appointment") == QueryComplexity.COMPLEX
+    assert detect_complexity("if it rains then close the windows") == QueryComplexity.COMPLEX
+    # Complex patterns win over simple ones in the same query
+    assert detect_complexity("please explain the weather") == QueryComplexity.COMPLEX
+    # Word count heuristic when no pattern matches
+    assert detect_complexity("kitchen lights") == QueryComplexity.SIMPLE
+    assert detect_complexity(" ".join(["word"] * 16)) == QueryComplexity.COMPLEX
+    # Simple phrases are not scanned for in queries over 20 words
+    assert detect_complexity("turn on " + " ".join(["word"] * 19)) == QueryComplexity.COMPLEX
+    assert detect_complexity("turn on " + " ".join(["word"] * 12)) == QueryComplexity.SIMPLE
+    # ...and neither are simple trigger words
+    assert detect_complexity("what " + " ".join(["word"] * 20)) == QueryComplexity.COMPLEX
+    assert detect_complexity("please " + " ".join(["word"] * 21)) == QueryComplexity.COMPLEX
+    assert detect_complexity("what " + " ".join(["word"] * 12)) == QueryComplexity.SIMPLE
+    print("✓ Complexity detection test passed")
+
+
+def test_complexity_probability():
+    """Test that the logistic router scores device commands low and reasoning queries high"""
+    assert complexity_probability("turn on the kitchen lights") < 0.5
+    assert complexity_probability("what time is it") < 0.5
+    assert complexity_probability("explain why the sky is blue") > 0.5
+    assert complexity_probability("plan my week around the dentist appointment") > 0.5
+    # Very negative scores stay finite
+    assert 0.0 <= complexity_probability(" ".join(["on"] * 2000)) < 0.01
+    print("✓ Complexity probability test passed")
+
+
+def test_debug_cache():
+    """Test that routing classifier cache counters are exposed"""
+    detect_complexity("Turn on the kitchen lights")
+    detect_complexity("turn on the kitchen lights ")
+    response = client.get("/debug/cache")
+    assert response.status_code == 200
+    info = response.json()["detect_complexity"]
+    assert info["hits"] >= 1
+    assert info["maxsize"] == 4096
+    print("✓ Debug cache test passed")
+
+
+def test_stream_tool():
+    """Test the SSE tool variant sends an ack event, then the ToolResponse"""
+    response = client.post("/tool/execute_ha_skill/stream", json={"skill_name": "lights_on"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line]
+    assert "ack" in events[0]
+    assert events[1]["result"]["success"] is True
+    assert events[1]["result"]["data"]["skill_name"] == "lights_on"
+
+    assert client.post("/tool/nope/stream").status_code == 404
+    assert client.post("/tool/execute_ha_skill/stream", json={}).status_code == 422
+    print("✓ Stream tool test passed")
+
+
+def test_tool_batch():
+    """Test that batched tool calls return one ToolResponse per call, in order"""
+    response = client.post("/tool/batch", json={"calls": [
+        {"name": "execute_ha_skill", "arguments": {"skill_name": "lights_on"}},
+        {"name": "get_time"},
+        {"name": "nope"},
+        {"name": "execute_ha_skill", "arguments": {}},
+    ]})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 4
+    assert results[0]["data"]["skill_name"] == "lights_on"
+    assert "time" in results[1]["data"]
+    assert results[2]["success"] is False
+    assert results[3]["success"] is False
+    print("✓ Tool batch test passed")
+
+
 def run_all_tests():
     """Run all tests"""
     print("\n" + "="*60)
@@ -152,6 +238,11 @@ def run_all_tests():
     test_letta_query_tool()
     test_execute_ha_skill_tool()
     test_tool_definitions_format()
+    test_detect_complexity_routing()
+    test_complexity_probability()
+    test_debug_cache()
+    test_stream_tool()
+    test_tool_batch()
     
     print("\n" + "="*60)
     print("All tests completed successfully!")
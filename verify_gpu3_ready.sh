@@ -46,9 +46,11 @@ if ! command -v nvidia-smi &> /dev/null; then
     exit 1
 fi
 
-GPU_COUNT=$(nvidia-smi --query-gpu=name --format=csv,noheader | wc -l)
+# Query once and reuse: each nvidia-smi call reloads NVML
+GPU_LIST=$(nvidia-smi --query-gpu=index,name,memory.total --format=csv,noheader || true)
+GPU_COUNT=$(printf '%s\n' "$GPU_LIST" | grep -c . || true)
 echo "  Found $GPU_COUNT GPUs:"
-nvidia-smi --query-gpu=index,name,memory.total --format=csv,noheader | nl -v 0
+printf '%s\n' "$GPU_LIST" | nl -v 0
 
 if [ "$GPU_COUNT" -lt 4 ]; then
     echo "⚠️  WARNING: Expected 4 GPUs, found $GPU_COUNT"
@@ -18,7 +18,7 @@ checks_total=0
 # Check 1: nvidia-smi shows K80
 checks_total=$((checks_total + 1))
 echo -n "1. Checking if K80 is visible... "
-if nvidia-smi | grep -q "Tesla K80"; then
+if nvidia-smi --query-gpu=name --format=csv,noheader 2>/dev/null | grep -qF "Tesla K80"; then
     echo -e "${GREEN}✓ K80 detected${NC}"
     checks_passed=$((checks_passed + 1))
 else